@@ -7,9 +7,23 @@ import numpy as np
 import pandas as pd
 import openpyxl
 import openpyxl.styles
-from .csp_algorithms import ac3, forward_checking, backtracking_search
+from .csp_algorithms import ac3, forward_checking_search, backtracking_search, mac_search
+from .propagation import propagate_board, passes_by_name
+from .dfs_engine import DepthFirstEngine
+from .best_first import best_first_search, unit_cost
+from .heuristics import DEFAULT_HEURISTIC, heuristic_by_name
+from .ida_star import IterativeDeepeningAStar
+from .and_or_search import and_or_search, plan_actions
+from .dlx import dlx_search
+from .sat_solver import sat_search
+from .solution_counter import count_solutions
 from .reinforcement_learning import QLearning
-from utils.constants import SOLVE_TIMEOUT
+from utils.constants import SOLVE_TIMEOUT, BFS_MEMORY_LIMIT, IDS_FRONTIER_LIMIT
+from utils.state_key import StateKeySet, PackedFrontier, child_key, pack_state, packed_child, unpack_state
+
+# Estimated memory per hashed visited entry and per recorded state besides its array
+VISITED_ENTRY_BYTES = 64
+STATE_OVERHEAD_BYTES = 112
 
 class AlgorithmManager:
     def __init__(self):
@@ -41,6 +55,9 @@ class AlgorithmManager:
             "AC-3": self.ac3_solver,
             "Forward Checking": self.forward_checking_solver,
             "Backtracking": self.backtracking_solver,
+            "Dancing Links (DLX)": self.dlx_solver,
+            "Maintaining Arc Consistency (MAC)": self.mac_solver,
+            "SAT": self.sat_solver,
             
             # Reinforcement Learning
             "Q-Learning": self.q_learning_solver
@@ -51,6 +68,36 @@ class AlgorithmManager:
         self.states = []
         self.q_learning = QLearning()  # Initialize Q-Learning agent
         
+        # Visited sets store 64-bit Zobrist hashes; set to True to also keep
+        # the packed 41-byte states and rule out hash collisions
+        self.exact_state_keys = False
+
+        # Propagation passes, by name (see propagation.PASSES), that AC-3,
+        # Backtracking and the informed searches run to a fixpoint before
+        # branching; None keeps the plain algorithms
+        self.propagation = None
+
+        # Backtracking jumps back to the cause of a failure and learns
+        # nogoods instead of backtracking chronologically
+        self.backjumping = False
+
+        # Backtracking is randomised and restarted on a Luby schedule, which
+        # cuts off the heavy tail of unlucky early choices (used unless one
+        # of the options above is set)
+        self.restarts = True
+
+        # Breadth-First Search gives up beyond this many bytes and sets
+        # self.truncated instead of exhausting the machine's memory
+        self.memory_limit = BFS_MEMORY_LIMIT
+
+        # Iterative Deepening Search resumes each depth limit from the cutoff
+        # nodes of the previous one while they fit in this many bytes
+        self.ids_frontier_limit = IDS_FRONTIER_LIMIT
+
+        # Heuristic used by A*, Greedy and IDA*, by name (see heuristics.HEURISTICS)
+        self.heuristic = DEFAULT_HEURISTIC
+        self.truncated = False
+        
         # For Partial Observation Search
         self.observations = {}
         self.hidden_cells = set()
@@ -62,6 +109,7 @@ class AlgorithmManager:
         self.timeout = timeout
         self.start_time = time.time()
         self.cancel_flag = cancel_flag if cancel_flag is not None else (lambda: False)
+        self.truncated = False
         
         start_time = self.start_time
         if algorithm_name in self.algorithms:
@@ -84,6 +132,47 @@ class AlgorithmManager:
             return metrics
         return None
 
+    def should_stop(self):
+        """True once the current solve has been cancelled or has run out of time"""
+        return self.cancel_flag() or time.time() - self.start_time > self.timeout
+
+    def propagation_passes(self):
+        """The pass functions selected by self.propagation, or None"""
+        if self.propagation is None:
+            return None
+        return passes_by_name(self.propagation)
+
+    def presolve(self, board):
+        """Fill in everything the propagation passes deduce.
+
+        Returns the filled cells, for clear_cells() to take back if the
+        search that follows fails, or None if the board is contradictory.
+        """
+        if self.propagation is None:
+            return []
+        steps_counter = [self.steps]
+        filled = propagate_board(board, self.propagation_passes(), steps_counter, self.states)
+        self.steps = steps_counter[0]
+        return filled
+
+    def clear_cells(self, board, cells):
+        """Empty the given (row, col) cells again"""
+        for row, col in cells:
+            board.set_value(row, col, 0)
+
+    def run_backtracking(self, board, steps_counter):
+        """backtracking_search with the options selected on this manager"""
+        # Restarts give way to the other options, which cannot be combined with them
+        restarts = self.restarts and not self.backjumping and self.propagation is None
+        return backtracking_search(board, steps_counter, self.states, self.propagation_passes(),
+                                   backjumping=self.backjumping, restarts=restarts,
+                                   should_stop=self.should_stop)
+
+    def count_solutions(self, board, limit=2):
+        """Count the solutions of a board (or 9x9 array), stopping at `limit`"""
+        state = board.get_board_state() if hasattr(board, "get_board_state") else board
+        return count_solutions(state, limit)
+
     def export_to_excel(self, metrics):
         """Export the solution process to an Excel file"""
         try:
@@ -148,6 +237,9 @@ class AlgorithmManager:
             "AC-3": "O(n²d³)",
             "Forward Checking": "O(d²n)",
             "Backtracking": "O(d^n)",
+            "Dancing Links (DLX)": "O(d^n)",
+            "Maintaining Arc Consistency (MAC)": "O(d^n)",
+            "SAT": "O(2^n)",
             
             # Reinforcement Learning
             "Q-Learning": "O(n * m)"  # n: states, m: actions
@@ -155,52 +247,16 @@ class AlgorithmManager:
         return complexities.get(algorithm_name, "Unknown")
 
     def depth_first_search(self, board):
-        import numpy as np
         self.steps = 0
         self.states = []
-        start_state = board.get_board_state()
-        start_pos = board.find_empty()
-        if not start_pos:
-            return True
-        stack = [(np.copy(start_state), start_pos)]
-        visited = set()
-        def get_state_key(state):
-            return tuple(map(tuple, state))
-        while stack:
-            if self.cancel_flag():
-                return False
-            if time.time() - self.start_time > self.timeout:
-                return False
-                
-            current_state, pos = stack.pop()
-            board.set_board_state(current_state)
-            self.steps += 1
-            self.states.append(board.get_board_state().copy())
-            if not pos:
-                return True
-            row, col = pos
-            for num in range(1, 10):
-                if board.is_valid_move(row, col, num):
-                    new_state = np.copy(current_state)
-                    new_state[row][col] = num
-                    board.set_board_state(new_state)
-                    next_pos = board.find_empty()
-                    state_key = get_state_key(new_state)
-                    if state_key not in visited:
-                        visited.add(state_key)
-                        stack.append((np.copy(new_state), next_pos))
-        board.set_board_state(start_state)
-        return False
+        engine = DepthFirstEngine(board, self.states, self.should_stop)
+        result = engine.search()
+        self.steps = engine.nodes
+        return result
 
     def breadth_first_search(self, board):
-        # Implementation for BFS
-        from collections import deque
-        import numpy as np
-        
-        def get_state_key(state):
-            return tuple(map(tuple, state))
-            
-        queue = deque()
+        # Frontier entries are packed 41-byte states and the visited set keeps
+        # 64-bit hashes; the search stops at self.memory_limit bytes
         start_state = board.get_board_state()
         start_pos = board.find_empty()
         
@@ -208,298 +264,109 @@ class AlgorithmManager:
         if not start_pos:
             return True
             
-        queue.append((start_state, start_pos))
-        visited = set([get_state_key(start_state)])
+        queue = PackedFrontier()
+        queue.append(pack_state(start_state))
+        visited = StateKeySet(self.exact_state_keys)
+        visited.add(board.get_state_key(), start_state)
+        trace_bytes = 0
 
-        while queue:
-            if self.cancel_flag():
+        while len(queue):
+            if self.should_stop():
+                board.set_board_state(start_state)
                 return False
-            if time.time() - self.start_time > self.timeout:
+
+            # Rough footprint: packed frontier, hashed visited entries and the state trace
+            used = queue.nbytes() + len(visited) * VISITED_ENTRY_BYTES + trace_bytes
+            if used > self.memory_limit:
+                self.truncated = True
+                board.set_board_state(start_state)
                 return False
                 
             self.steps += 1
-            current_state, pos = queue.popleft()
+            packed = queue.popleft()
             
             # Set the board to the current state for valid move checking
-            board.set_board_state(current_state)
-            self.states.append(board.get_board_state().copy())
+            board.set_board_state(unpack_state(packed))
+            # Recorded as uint8: the trace is otherwise the largest consumer
+            state = board.board.astype(np.uint8)
+            self.states.append(state)
+            trace_bytes += state.nbytes + STATE_OVERHEAD_BYTES
             
-            # If no empty positions, we've found a solution
-            if not pos:
-                return True
-                
-            row, col = pos
+            row, col = board.find_empty()
+            parent_key = board.get_state_key()
+            last_cell = board.count_empty() == 1
             
             # Try all possible values for the current empty cell
-            for num in range(1, 10):
-                if board.is_valid_move(row, col, num):
-                    # Create a new state with the number placed
-                    new_state = np.copy(current_state)
-                    new_state[row][col] = num
-                    
-                    # Find the next empty cell
-                    board.set_board_state(new_state)
-                    next_pos = board.find_empty()
-                    
-                    # If no more empty cells, we've found a solution
-                    if not next_pos:
-                        board.set_board_state(new_state)
-                        self.states.append(board.get_board_state().copy())
-                        return True
-                    
-                    # Add the new state to the queue if not visited
-                    new_key = get_state_key(new_state)
-                    if new_key not in visited:
-                        visited.add(new_key)
-                        queue.append((new_state, next_pos))
+            for num in board.get_candidates(row, col):
+                # If no more empty cells, we've found a solution
+                if last_cell:
+                    board.set_value(row, col, num)
+                    self.states.append(board.get_board_state())
+                    return True
+                
+                # Add the new state to the queue if not visited
+                new_key = child_key(parent_key, row, col, num)
+                new_packed = packed_child(packed, row, col, num)
+                if visited.add(new_key, unpack_state(new_packed) if self.exact_state_keys else None):
+                    queue.append(new_packed)
         
         # If we've exhausted all possibilities without finding a solution
         board.set_board_state(start_state)
         return False
 
     def uniform_cost_search(self, board):
-        # Basic implementation of Uniform Cost Search
-        return self.depth_first_search(board)  # Simplified version
+        # Cheapest path first: every placement costs 1 and there is no heuristic
+        steps_counter = [0]
+        result = best_first_search(board, cost=unit_cost, steps_counter=steps_counter, states=self.states,
+                                   should_stop=self.should_stop, exact_keys=self.exact_state_keys)
+        self.steps = steps_counter[0]
+        return result
 
     def iterative_deepening_search(self, board):
-        import numpy as np
         self.steps = 0
         self.states = []
-        start_state = board.get_board_state()
-        start_pos = board.find_empty()
-        if not start_pos:
-            return True
-        def get_state_key(state):
-            return tuple(map(tuple, state))
-        max_depth = 81  # Số ô tối đa của Sudoku
-        for depth_limit in range(max_depth + 1):
-            if self.cancel_flag():
-                return False
-            if time.time() - self.start_time > self.timeout:
-                return False
-                
-            stack = [(np.copy(start_state), start_pos, 0)]  # (state, pos, depth)
-            visited = set()
-            while stack:
-                if self.cancel_flag():
-                    return False
-                if time.time() - self.start_time > self.timeout:
-                    return False
-                    
-                current_state, pos, depth = stack.pop()
-                board.set_board_state(current_state)
-                self.steps += 1
-                self.states.append(board.get_board_state().copy())
-                if not pos:
-                    return True
-                if depth >= depth_limit:
-                    continue
-                row, col = pos
-                for num in range(1, 10):
-                    if board.is_valid_move(row, col, num):
-                        new_state = np.copy(current_state)
-                        new_state[row][col] = num
-                        board.set_board_state(new_state)
-                        next_pos = board.find_empty()
-                        state_key = get_state_key(new_state)
-                        if state_key not in visited:
-                            visited.add(state_key)
-                            stack.append((np.copy(new_state), next_pos, depth + 1))
-        board.set_board_state(start_state)
-        return False
+        engine = DepthFirstEngine(board, self.states, self.should_stop)
+        result = engine.iterative_deepening(self.ids_frontier_limit)
+        self.steps = engine.nodes
+        return result
 
     def a_star_search(self, board):
-        from queue import PriorityQueue
-        import numpy as np
-        
-        # Simple wrapper class to make comparison work in priority queue
-        class PrioritizedItem:
-            def __init__(self, priority, item):
-                self.priority = priority
-                self.item = item
-                
-            def __lt__(self, other):
-                return self.priority < other.priority
-        
-        def get_state_key(state):
-            return tuple(map(tuple, state))
-            
-        pq = PriorityQueue()
-        start_state = board.get_board_state()
-        start_pos = board.find_empty()
-        
-        # If no empty positions, the board is already solved
-        if not start_pos:
-            return True
-            
-        g_score = {get_state_key(start_state): 0}
-        visited = set([get_state_key(start_state)])
-        
-        # Priority queue items with wrapper
-        h_score = self.get_heuristic(board)
-        pq.put(PrioritizedItem(h_score, (start_state, start_pos)))
-        
-        while not pq.empty():
-            if self.cancel_flag():
-                return False
-            if time.time() - self.start_time > self.timeout:
-                return False
-                
-            self.steps += 1
-            current = pq.get().item
-            current_state, pos = current
-            
-            # Set the board to the current state
-            board.set_board_state(current_state)
-            self.states.append(board.get_board_state().copy())
-            
-            # If no empty positions, we've found a solution
-            if not pos:
-                return True
-                
-            row, col = pos
-            state_key = get_state_key(current_state)
-            
-            # Try all possible values for the current empty cell
-            for num in range(1, 10):
-                if board.is_valid_move(row, col, num):
-                    # Create a new state with the number placed
-                    new_state = np.copy(current_state)
-                    new_state[row][col] = num
-                    
-                    # Find the next empty cell
-                    board.set_board_state(new_state)
-                    next_pos = board.find_empty()
-                    
-                    # If no more empty cells, we've found a solution
-                    if not next_pos:
-                        board.set_board_state(new_state)
-                        self.states.append(board.get_board_state().copy())
-                        return True
-                    
-                    # Calculate new g_score
-                    new_key = get_state_key(new_state)
-                    tentative_g_score = g_score[state_key] + 1
-                    
-                    # If we found a better path or haven't visited this state
-                    if new_key not in g_score or tentative_g_score < g_score[new_key]:
-                        # Update g_score
-                        g_score[new_key] = tentative_g_score
-                        
-                        # Calculate f_score = g_score + heuristic
-                        h_score = self.get_heuristic(board)
-                        f_score = tentative_g_score + h_score
-                        
-                        # Add to priority queue if not visited
-                        if new_key not in visited:
-                            visited.add(new_key)
-                            pq.put(PrioritizedItem(f_score, (new_state, next_pos)))
-        
-        # If we've exhausted all possibilities without finding a solution
-        board.set_board_state(start_state)
-        return False
+        filled = self.presolve(board)
+        if filled is None:
+            return False
+        steps_counter = [self.steps]
+        result = best_first_search(board, cost=unit_cost, heuristic=heuristic_by_name(self.heuristic),
+                                   steps_counter=steps_counter, states=self.states,
+                                   should_stop=self.should_stop, exact_keys=self.exact_state_keys)
+        self.steps = steps_counter[0]
+        if not result:
+            self.clear_cells(board, filled)
+        return result
 
     def greed_search(self, board):
-        from queue import PriorityQueue
-        import numpy as np
-        class PrioritizedItem:
-            def __init__(self, priority, item):
-                self.priority = priority
-                self.item = item
-            def __lt__(self, other):
-                return self.priority < other.priority
-        def get_state_key(state):
-            return tuple(map(tuple, state))
-        pq = PriorityQueue()
-        start_state = board.get_board_state()
-        start_pos = board.find_empty()
-        if not start_pos:
-            return True
-        visited = set([get_state_key(start_state)])
-        h_score = self.get_heuristic(board)
-        pq.put(PrioritizedItem(h_score, (start_state, start_pos)))
-        while not pq.empty():
-            if self.cancel_flag():
-                return False
-            if time.time() - self.start_time > self.timeout:
-                return False
-            self.steps += 1
-            current = pq.get().item
-            current_state, pos = current
-            board.set_board_state(current_state)
-            self.states.append(board.get_board_state().copy())
-            if not pos:
-                return True
-            row, col = pos
-            for num in range(1, 10):
-                if board.is_valid_move(row, col, num):
-                    new_state = np.copy(current_state)
-                    new_state[row][col] = num
-                    board.set_board_state(new_state)
-                    next_pos = board.find_empty()
-                    new_key = get_state_key(new_state)
-                    if not next_pos:
-                        board.set_board_state(new_state)
-                        self.states.append(board.get_board_state().copy())
-                        return True
-                    if new_key not in visited:
-                        visited.add(new_key)
-                        h_score = self.get_heuristic(board)
-                        pq.put(PrioritizedItem(h_score, (new_state, next_pos)))
-        board.set_board_state(start_state)
-        return False
+        filled = self.presolve(board)
+        if filled is None:
+            return False
+        steps_counter = [self.steps]
+        result = best_first_search(board, heuristic=heuristic_by_name(self.heuristic),
+                                   steps_counter=steps_counter, states=self.states,
+                                   should_stop=self.should_stop, exact_keys=self.exact_state_keys)
+        self.steps = steps_counter[0]
+        if not result:
+            self.clear_cells(board, filled)
+        return result
 
     def ida_star_search(self, board):
-        import numpy as np
-        self.steps = 0
-        self.states = []
-        start_state = board.get_board_state()
-        start_pos = board.find_empty()
-        if not start_pos:
-            return True
-        def get_state_key(state):
-            return tuple(map(tuple, state))
-        bound = self.get_heuristic(board)
-        while True:
-            if self.cancel_flag():
-                return False
-            if time.time() - self.start_time > self.timeout:
-                return False
-                
-            stack = [(np.copy(start_state), start_pos, 0)]  # (state, pos, g)
-            visited = set()
-            min_exceed = float('inf')
-            while stack:
-                if self.cancel_flag():
-                    return False
-                if time.time() - self.start_time > self.timeout:
-                    return False
-                    
-                current_state, pos, g = stack.pop()
-                board.set_board_state(current_state)
-                self.steps += 1
-                self.states.append(board.get_board_state().copy())
-                if not pos:
-                    return True
-                f = g + self.get_heuristic(board)
-                if f > bound:
-                    min_exceed = min(min_exceed, f)
-                    continue
-                row, col = pos
-                for num in range(1, 10):
-                    if board.is_valid_move(row, col, num):
-                        new_state = np.copy(current_state)
-                        new_state[row][col] = num
-                        board.set_board_state(new_state)
-                        next_pos = board.find_empty()
-                        state_key = get_state_key(new_state)
-                        if state_key not in visited:
-                            visited.add(state_key)
-                            stack.append((np.copy(new_state), next_pos, g + 1))
-            if min_exceed == float('inf'):
-                board.set_board_state(start_state)
-                return False
-            bound = min_exceed
+        filled = self.presolve(board)
+        if filled is None:
+            return False
+        engine = IterativeDeepeningAStar(board, heuristic_by_name(self.heuristic), self.states,
+                                         self.should_stop, exact_keys=self.exact_state_keys)
+        result = engine.search()
+        self.steps += engine.nodes
+        if not result:
+            self.clear_cells(board, filled)
+        return result
 
     def simple_hill_climbing(self, board):
         def get_neighbors(state):
@@ -642,7 +509,7 @@ class AlgorithmManager:
                 return None
             
             i, j = random.choice(empty_cells)
-            valid_numbers = [num for num in range(1, 10) if board.is_valid_move(i, j, num)]
+            valid_numbers = board.get_candidates(i, j)
             if not valid_numbers:
                 return None
             
@@ -717,7 +584,7 @@ class AlgorithmManager:
                 return None
             
             i, j = random.choice(empty_cells)
-            valid_numbers = [num for num in range(1, 10) if board.is_valid_move(i, j, num)]
+            valid_numbers = board.get_candidates(i, j)
             if not valid_numbers:
                 return None
             
@@ -893,7 +760,7 @@ class AlgorithmManager:
                 random.shuffle(empty_cells)
                 
                 for i, j in empty_cells:
-                    valid_numbers = [num for num in range(1, 10) if board.is_valid_move(i, j, num)]
+                    valid_numbers = board.get_candidates(i, j)
                     if valid_numbers:
                         value = random.choice(valid_numbers)
                         state[i][j] = value
@@ -1077,139 +944,21 @@ class AlgorithmManager:
         - OR nodes: different ways to fill an empty cell
         - AND nodes: all empty cells must be filled
         """
-        # Lưu trữ memoization để tránh tính toán lại các trạng thái đã thăm
-        memo = {}
-        
-        def get_state_key(state):
-            return tuple(map(tuple, state))
-        
-        def find_all_empty_positions(state):
-            """Tìm tất cả các vị trí trống trong bảng Sudoku"""
-            empty_positions = []
-            for i in range(9):
-                for j in range(9):
-                    if state[i][j] == 0:
-                        empty_positions.append((i, j))
-            return empty_positions
-            
-        def or_search(state, goal_test):
-            """Xử lý nút OR: tìm một trong các cách để điền vào một ô trống cụ thể"""
-            if self.cancel_flag():
-                return False, None
-            if time.time() - self.start_time > self.timeout:
-                return False, None
-            
-            state_key = get_state_key(state)
-            
-            # Kiểm tra nếu trạng thái đã được tính toán trước đó
-            if state_key in memo:
-                return memo[state_key]
-            
-            self.steps += 1
-            self.states.append(state.copy())
-            
-            # Kiểm tra nếu đã giải quyết được bài toán
-            if goal_test(state):
-                return True, []
-            
-            empty_pos = board.find_empty()
-            if not empty_pos:
-                return True, []  # Không còn ô trống nào
-            
-            # Xử lý nút OR: chọn một giá trị cho ô trống hiện tại
-            row, col = empty_pos
-            
-            for num in range(1, 10):
-                board.set_board_state(state)
-                if board.is_valid_move(row, col, num):
-                    # Tạo trạng thái mới với giá trị đã điền
-                    new_state = state.copy()
-                    new_state[row][col] = num
-                    
-                    # Đệ quy để giải tất cả các ô trống còn lại (AND node)
-                    result, sub_plan = and_search(new_state, goal_test)
-                    
-                    if result:
-                        # Tìm thấy lời giải
-                        plan = [("Fill", row, col, num)]
-                        if sub_plan:
-                            plan.extend(sub_plan)
-                        memo[state_key] = (True, plan)
-                        return True, plan
-            
-            # Không tìm thấy lời giải
-            memo[state_key] = (False, None)
-            return False, None
-            
-        def and_search(state, goal_test):
-            """Xử lý nút AND: giải tất cả các ô trống còn lại"""
-            if self.cancel_flag():
-                return False, None
-            if time.time() - self.start_time > self.timeout:
-                return False, None
-                
-            state_key = get_state_key(state)
-            
-            # Kiểm tra nếu trạng thái đã được tính toán trước đó
-            if state_key in memo:
-                return memo[state_key]
-            
-            # Kiểm tra nếu đã giải quyết được bài toán
-            if goal_test(state):
-                return True, []
-            
-            empty_pos = board.find_empty()
-            if not empty_pos:
-                return True, []  # Không còn ô trống nào
-            
-            # Đệ quy để giải OR node (chọn giá trị cho ô trống)
-            result, plan = or_search(state, goal_test)
-            
-            if result:
-                memo[state_key] = (True, plan)
-                return True, plan
-            
-            # Không tìm thấy lời giải
-            memo[state_key] = (False, None)
-            return False, None
-            
-        def goal_test(state):
-            """Kiểm tra xem bảng Sudoku đã được giải hoàn toàn chưa"""
-            board.set_board_state(state)
-            for i in range(9):
-                for j in range(9):
-                    if board.get_value(i, j) == 0:
-                        return False
-                    # Kiểm tra tính hợp lệ
-                    value = board.get_value(i, j)
-                    board.set_value(i, j, 0)  # Tạm thời xóa giá trị
-                    is_valid = board.is_valid_move(i, j, value)
-                    board.set_value(i, j, value)  # Đặt lại giá trị
-                    if not is_valid:
-                        return False
-            return True
-            
-        # Bắt đầu thuật toán AND-OR Search với trạng thái hiện tại
-        start_state = board.get_board_state()
-        result, plan = and_search(start_state, goal_test)
-        
-        if result:
-            # Áp dụng kế hoạch để tìm ra lời giải
-            board.set_board_state(start_state)
-            for action in plan:
-                action_type, row, col, value = action
-                board.set_value(row, col, value)
-        
-        return result
+        steps_counter = [self.steps]
+        plan = and_or_search(board, steps_counter, self.states, should_stop=self.should_stop,
+                             exact_keys=self.exact_state_keys)
+        self.steps = steps_counter[0]
+        if plan is None:
+            return False
+
+        # Áp dụng kế hoạch để tìm ra lời giải
+        for _, row, col, value in plan_actions(plan):
+            board.set_value(row, col, value)
+        return True
 
     def get_heuristic(self, board):
-        # Count the number of empty cells as a heuristic
-        empty_count = 0
-        for i in range(9):
-            for j in range(9):
-                if board.get_value(i, j) == 0:
-                    empty_count += 1
-        return empty_count
+        # Value of the selected heuristic (see heuristics.HEURISTICS), from scratch
+        return heuristic_by_name(self.heuristic).evaluate(board)
 
     def count_conflicts(self, board):
         conflicts = 0
@@ -1256,7 +1005,7 @@ class AlgorithmManager:
         # Nếu chưa, sử dụng backtracking để giải tiếp
         if result and board.find_empty() is not None:
             # AC-3 đã thành công nhưng chưa giải hoàn toàn, dùng backtracking để giải tiếp
-            result = backtracking_search(board, steps_counter, self.states)
+            result = self.run_backtracking(board, steps_counter)
             self.steps = steps_counter[0]  # Cập nhật lại số bước
         
         end_time = time.time()
@@ -1275,63 +1024,14 @@ class AlgorithmManager:
         return None
 
     def forward_checking_solver(self, board):
-        """Solve Sudoku using Forward Checking"""
-        self.steps = 0
-        self.start_state = board.get_board_state()
-        self.states = [self.start_state.copy()]
-        
-        start_time = time.time()
-        
-        # Sử dụng list để truyền tham chiếu đến biến đếm bước
+        """Solve Sudoku using backtracking with forward checking"""
         steps_counter = [0]
-        
-        # Use forward checking with backtracking
-        pos = board.find_empty()
-        if pos:
-            row, col = pos
-            for value in range(1, 10):
-                if self.cancel_flag():
-                    return None
-                if time.time() - self.start_time > self.timeout:
-                    return None
-                    
-                if board.is_valid_move(row, col, value):
-                    # If value is consistent with constraints
-                    if forward_checking(board, pos, value, steps_counter):
-                        board.set_value(row, col, value)
-                        self.states.append(board.get_board_state().copy())
-                        if self.forward_checking_solver(board):
-                            # Lấy số bước từ thuật toán con và cộng vào
-                            self.steps += steps_counter[0]
-                            end_time = time.time()
-                            self.target_state = board.get_board_state()
-                            metrics = {
-                                "steps": self.steps,
-                                "time": end_time - start_time,
-                                "complexity": "O(d²n)",
-                                "start_state": self.start_state,
-                                "target_state": self.target_state,
-                                "states": self.states
-                            }
-                            return metrics
-                        board.set_value(row, col, 0)
-                        self.states.append(board.get_board_state().copy())
-        else:
-            end_time = time.time()
-            self.target_state = board.get_board_state()
-            metrics = {
-                "steps": self.steps,
-                "time": end_time - start_time,
-                "complexity": "O(d²n)",
-                "start_state": self.start_state,
-                "target_state": self.target_state,
-                "states": self.states
-            }
-            return metrics
-        return None
+        result = forward_checking_search(board, steps_counter, self.states, should_stop=self.should_stop)
+        self.steps = steps_counter[0]
+        return result
 
     def backtracking_solver(self, board):
-        """Solve Sudoku using Backtracking with Forward Checking"""
+        """Solve Sudoku using Backtracking (with the propagation, backjumping or restart options set on the manager)"""
         self.steps = 0
         self.start_state = board.get_board_state()
         self.states = [self.start_state.copy()]
@@ -1346,7 +1046,7 @@ class AlgorithmManager:
         
         # Sử dụng list để truyền tham chiếu đến biến đếm bước
         steps_counter = [0]
-        result = backtracking_search(board, steps_counter, self.states)
+        result = self.run_backtracking(board, steps_counter)
         self.steps = steps_counter[0]  # Cập nhật số bước từ thuật toán
         
         end_time = time.time()
@@ -1364,6 +1064,27 @@ class AlgorithmManager:
             return metrics
         return None
 
+    def dlx_solver(self, board):
+        """Solve Sudoku as an exact cover problem with Dancing Links (Algorithm X)"""
+        steps_counter = [0]
+        result = dlx_search(board, steps_counter, self.states, should_stop=self.should_stop)
+        self.steps = steps_counter[0]
+        return result
+
+    def mac_solver(self, board):
+        """Solve Sudoku with Maintaining Arc Consistency, MRV/degree and LCV ordering"""
+        steps_counter = [0]
+        result = mac_search(board, steps_counter, self.states, should_stop=self.should_stop)
+        self.steps = steps_counter[0]
+        return result
+
+    def sat_solver(self, board):
+        """Solve Sudoku as a CNF formula with the built-in CDCL engine"""
+        steps_counter = [0]
+        result = sat_search(board, steps_counter, self.states, should_stop=self.should_stop)
+        self.steps = steps_counter[0]
+        return result
+
     def q_learning_solver(self, board):
         """Solve Sudoku using Q-Learning"""
         self.steps = 0
@@ -0,0 +1,88 @@
+from utils.state_key import BoundedTable
+
+# Boards whose outcome the AND-OR memo remembers
+AND_OR_MEMO_LIMIT = 100000
+
+# A plan is a linked list: () when nothing is left to do, otherwise
+# (action, rest) where rest is the plan of the board the action leads to,
+# so a parent's plan shares its child's instead of copying it
+EMPTY_PLAN = ()
+
+_UNKNOWN = object()
+
+
+def plan_actions(plan):
+    """Yield the ("Fill", row, col, num) actions of a plan in order"""
+    while plan:
+        action, plan = plan
+        yield action
+
+
+def and_or_search(board, steps_counter=None, states=None, should_stop=None, exact_keys=False,
+                  memo_limit=AND_OR_MEMO_LIMIT):
+    """AND-OR graph search over the board, mutated in place.
+
+    An OR node picks a digit for the first empty cell; the AND node it
+    leads to is the board with that digit placed, whose remaining cells
+    must all be filled. Nodes live on an explicit stack of
+    (key, row, col, digits left) frames over the one board (see
+    DepthFirstEngine for the undo scheme). The outcome of each board, its
+    plan or None when it failed, goes into a BoundedTable of `memo_limit`
+    entries keyed by Zobrist hash (packed state with exact_keys).
+    Placements are always valid, so a board without conflicts is solved
+    as soon as it has no empty cell.
+    Returns the plan, or None when there is none (or the search was
+    stopped); the board is left as it was.
+    """
+    if board.has_conflicts:
+        return None
+    memo = BoundedTable(memo_limit)
+
+    def key_of():
+        return board.get_packed_state() if exact_keys else board.get_state_key()
+
+    def enter():
+        """Outcome of the current board if already known, otherwise push its frame"""
+        key = key_of()
+        outcome = memo.get(key, _UNKNOWN)
+        if outcome is not _UNKNOWN:
+            return outcome
+        if steps_counter is not None:
+            steps_counter[0] += 1
+        if states is not None:
+            states.append(board.get_board_state())
+        if board.is_complete():
+            memo.put(key, EMPTY_PLAN)
+            return EMPTY_PLAN
+        row, col = board.find_empty()
+        mask = board.get_candidate_mask(row, col)
+        stack.append((key, row, col, [num for num in range(9, 0, -1) if mask >> num & 1]))
+        return _UNKNOWN
+
+    stack = []
+    outcome = enter()
+    while stack:
+        if should_stop is not None and should_stop():
+            outcome = None
+            break
+        key, row, col, digits = stack[-1]
+        if outcome is _UNKNOWN or outcome is None:
+            if outcome is None:
+                board.set_value(row, col, 0)
+            if digits:
+                board.set_value(row, col, digits.pop())
+                outcome = enter()
+                continue
+            # Every digit failed
+            outcome = None
+        else:
+            # The child just solved: this node's plan extends the child's
+            outcome = (("Fill", row, col, int(board.get_value(row, col))), outcome)
+            board.set_value(row, col, 0)
+        memo.put(key, outcome)
+        stack.pop()
+
+    # Take back whatever is still placed
+    for _, row, col, _ in reversed(stack):
+        board.set_value(row, col, 0)
+    return None if outcome is _UNKNOWN else outcome
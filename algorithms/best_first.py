@@ -0,0 +1,62 @@
+import heapq
+from itertools import count
+from .heuristics import DEAD_END
+from utils.state_key import StateKeySet, child_key, pack_state, packed_child, unpack_state
+
+
+def unit_cost(board, row, col, num):
+    """Every placement costs the same, so g is the search depth"""
+    return 1
+
+
+def best_first_search(board, cost=None, heuristic=None, steps_counter=None, states=None,
+                      should_stop=None, exact_keys=False):
+    """Best-first search ordered by f = g + h on a heapq of tuple priorities.
+
+    `cost(board, row, col, num)` is the price of a placement on the parent
+    board (g sums it, None keeps g at 0) and `heuristic` is a
+    heuristics.Heuristic, updated incrementally from parent to child (None
+    means h = 0): A* uses both, Greedy only h and Uniform Cost only g.
+    Children the heuristic marks as dead ends are dropped.
+    Equal f goes to the smaller h, then to the older entry through a
+    monotonically increasing counter. Nodes expand their most constrained
+    cell and live in the heap as packed 41-byte states.
+    Returns True with the solution on the board.
+    """
+    start_state = board.get_board_state()
+    if board.find_empty() is None:
+        return True
+
+    tie = count()
+    start_h = heuristic.evaluate(board) if heuristic is not None else 0
+    heap = [(start_h, start_h, next(tie), 0, board.get_state_key(), pack_state(start_state))]
+    closed = StateKeySet(exact_keys)
+
+    while heap:
+        if should_stop is not None and should_stop():
+            break
+        _, h, _, g, key, packed = heapq.heappop(heap)
+        state = unpack_state(packed)
+        if not closed.add(key, state):
+            continue
+
+        board.set_board_state(state)
+        if steps_counter is not None:
+            steps_counter[0] += 1
+        if states is not None:
+            states.append(board.get_board_state())
+
+        pos = board.find_most_constrained_empty()
+        if pos is None:
+            return True
+        row, col = pos
+        for num in board.get_candidates(row, col):
+            child_h = heuristic.update(board, h, row, col, num) if heuristic is not None else 0
+            if child_h == DEAD_END:
+                continue
+            child_g = g + cost(board, row, col, num) if cost is not None else 0
+            heapq.heappush(heap, (child_g + child_h, child_h, next(tie), child_g,
+                                  child_key(key, row, col, num), packed_child(packed, row, col, num)))
+
+    board.set_board_state(start_state)
+    return False
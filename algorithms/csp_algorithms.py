@@ -1,118 +1,390 @@
 import copy
-from collections import deque
+import random
+from collections import deque, OrderedDict
+from functools import lru_cache
+from math import isqrt
+from utils.grid_tables import ALL_DIGITS, CELL_COUNT, PEERS
+from .propagation import propagate_board
+
+# Every arc (xi, xj) between two peers, numbered once at import time:
+# arc ARC_IDS[xi][k] goes from xi to its k-th peer PEERS[xi][k]
+ARCS = [(xi, xj) for xi in range(CELL_COUNT) for xj in PEERS[xi]]
+ARC_IDS = [[xi * len(PEERS[xi]) + k for k in range(len(PEERS[xi]))] for xi in range(CELL_COUNT)]
+# Arcs (xk, xi) pointing at each cell xi, re-queued when xi's domain shrinks
+INCOMING_ARCS = [[ARC_IDS[xk][PEERS[xk].index(xi)] for xk in PEERS[xi]] for xi in range(CELL_COUNT)]
+
 
 def ac3(board, steps_counter=None, states=None):
-    """AC-3 algorithm for constraint propagation"""
-    def get_arcs():
-        arcs = []
-        # Add row constraints
-        for i in range(9):
-            for j in range(9):
-                for k in range(j + 1, 9):
-                    arcs.append(((i, j), (i, k)))
-                    arcs.append(((i, k), (i, j)))
-        
-        # Add column constraints
-        for j in range(9):
-            for i in range(9):
-                for k in range(i + 1, 9):
-                    arcs.append(((i, j), (k, j)))
-                    arcs.append(((k, j), (i, j)))
-        
-        # Add box constraints
-        for box_i in range(3):
-            for box_j in range(3):
-                cells = [(i + box_i * 3, j + box_j * 3) 
-                        for i in range(3) for j in range(3)]
-                for i, cell1 in enumerate(cells):
-                    for cell2 in cells[i + 1:]:
-                        arcs.append((cell1, cell2))
-                        arcs.append((cell2, cell1))
-        return arcs
-
-    def revise(domains, xi, xj):
-        revised = False
-        if board.get_value(*xi) != 0 or board.get_value(*xj) != 0:
-            return False
-        
-        for x in domains[xi][:]: # [:] được dùng để tạo bản sao
-            # If no value in xj's domain satisfies the constraint
-            if all(x == y for y in domains[xj]):
-                domains[xi].remove(x)
-                revised = True
-        return revised
-
-    # Initialize domains
-    domains = {}
-    for i in range(9):
-        for j in range(9):
-            if board.get_value(i, j) == 0:
-                domains[(i, j)] = list(range(1, 10))
-            else:
-                domains[(i, j)] = [board.get_value(i, j)]
-
-    # Get all arcs
-    queue = deque(get_arcs())
-    
+    """AC-3 algorithm for constraint propagation.
+
+    Domains are 9-bit masks (bit n = digit n). A digit is removed from xi
+    when xj can only take that digit; an in-queue bitmap keeps every arc
+    in the queue at most once.
+    """
+    values = [int(v) for row in board.get_board_state() for v in row]
+    domains = [1 << v if v else ALL_DIGITS for v in values]
+
+    queue = deque(range(len(ARCS)))
+    in_queue = bytearray(b"\x01") * len(ARCS)
+
     # Process all arcs
     step_count = 0
     while queue:
-        (xi, xj) = queue.popleft()
+        arc = queue.popleft()
+        in_queue[arc] = 0
         step_count += 1
         if steps_counter is not None:
             steps_counter[0] = step_count
-            
-        if revise(domains, xi, xj):
-            if len(domains[xi]) == 0:
-                return False
-            for xk in [(r, c) for r, c in domains.keys() if (r == xi[0] or c == xi[1] or (r//3 == xi[0]//3 and c//3 == xi[1]//3)) and (r, c) != xi]:
-                queue.append((xk, xi))
-    
+
+        xi, xj = ARCS[arc]
+        # Revise: only a singleton domain of xj rules a digit out of xi
+        other = domains[xj]
+        if values[xi] or other & (other - 1) or not domains[xi] & other:
+            continue
+        domains[xi] &= ~other
+        if not domains[xi]:
+            return False
+        for incoming in INCOMING_ARCS[xi]:
+            if not in_queue[incoming] and ARCS[incoming][0] != xj:
+                in_queue[incoming] = 1
+                queue.append(incoming)
+
     # Update board with reduced domains where possible
-    changes_made = False
-    for (i, j), domain in domains.items():
-        if len(domain) == 1 and board.get_value(i, j) == 0:
-            board.set_value(i, j, domain[0])
-            changes_made = True
+    for i, domain in enumerate(domains):
+        if not values[i] and not domain & (domain - 1):
+            board.set_value(i // 9, i % 9, domain.bit_length() - 1)
             step_count += 1
             if steps_counter is not None:
                 steps_counter[0] = step_count
             if states is not None:
                 states.append(board.get_board_state().copy())
-    
+
     return True
 
-def forward_checking(board, var, value, steps_counter=None):
-    """Forward checking for constraint propagation"""
+def init_domains(board):
+    """Per-cell domains as 9-bit masks, or None if an empty cell has no value left"""
+    domains = []
+    for i in range(CELL_COUNT):
+        row, col = divmod(i, 9)
+        value = board.get_value(row, col)
+        domain = 1 << value if value else board.get_candidate_mask(row, col)
+        if not domain:
+            return None
+        domains.append(domain)
+    return domains
+
+
+def forward_checking(domains, var, value, trail, steps_counter=None):
+    """Assign `value` to `var` and remove it from the domains of its peers.
+
+    Every domain that changes is pushed on `trail` as (cell, old domain) so
+    restore_domains() can undo the assignment. Returns False as soon as a
+    peer's domain is wiped out.
+    """
     if steps_counter is not None:
         steps_counter[0] += 1
-        
+
     row, col = var
-    
-    # Check row
-    for j in range(9):
-        if j != col and board.get_value(row, j) == value:
-            return False
-            
-    # Check column
-    for i in range(9):
-        if i != row and board.get_value(i, col) == value:
-            return False
-            
-    # Check box
-    box_row, box_col = 3 * (row // 3), 3 * (col // 3)
-    for i in range(box_row, box_row + 3):
-        for j in range(box_col, box_col + 3):
-            if (i != row or j != col) and board.get_value(i, j) == value:
+    cell = row * 9 + col
+    bit = 1 << value
+    trail.append((cell, domains[cell]))
+    domains[cell] = bit
+    for peer in PEERS[cell]:
+        domain = domains[peer]
+        if domain & bit:
+            trail.append((peer, domain))
+            domains[peer] = domain & ~bit
+            if domain == bit:
                 return False
-                
     return True
 
-def backtracking_search(board, steps_counter=None, states=None):
-    """Backtracking search with forward checking"""
+
+def restore_domains(domains, trail, mark):
+    """Undo every domain change pushed on `trail` since it had length `mark`"""
+    while len(trail) > mark:
+        cell, domain = trail.pop()
+        domains[cell] = domain
+
+
+def forward_checking_search(board, steps_counter=None, states=None, should_stop=None):
+    """Backtracking search that prunes the peers' domains after every assignment.
+
+    Variables are picked by smallest remaining domain and the board is
+    updated alongside the domains so the visualisation can replay it.
+    """
+    domains = init_domains(board)
+    if domains is None:
+        return False
+    empty = [i for i in range(CELL_COUNT) if not board.get_value(i // 9, i % 9)]
+    trail = []
+
+    def backtrack(depth):
+        if depth == len(empty):
+            return True
+        # Most constrained variable first: a cell left with one value is
+        # assigned right away, an emptied one is never reached
+        best = min(range(depth, len(empty)), key=lambda k: domains[empty[k]].bit_count())
+        empty[depth], empty[best] = empty[best], empty[depth]
+        cell = empty[depth]
+        var = divmod(cell, 9)
+        domain = domains[cell]
+        while domain:
+            if should_stop is not None and should_stop():
+                return False
+            bit = domain & -domain
+            domain ^= bit
+            value = bit.bit_length() - 1
+
+            mark = len(trail)
+            if forward_checking(domains, var, value, trail, steps_counter):
+                board.set_value(*var, value)
+                if states is not None:
+                    states.append(board.get_board_state().copy())
+                if backtrack(depth + 1):
+                    return True
+                board.set_value(*var, 0)
+                if states is not None:
+                    states.append(board.get_board_state().copy())
+            restore_domains(domains, trail, mark)
+        return False
+
+    return backtrack(0)
+
+# Learned nogoods kept by backjumping search before the oldest are evicted
+NOGOOD_LIMIT = 10000
+
+
+class NogoodTable:
+    """Bounded table of learned nogoods: sets of (cell, value) that cannot all hold.
+
+    Each nogood is indexed under its member with the highest cell index,
+    which with a static variable order is the one assigned last, so only
+    the nogoods completed by the assignment being tried have to be checked.
+    The oldest nogood is evicted once `limit` are stored.
+    """
+
+    def __init__(self, limit=NOGOOD_LIMIT):
+        self.limit = limit
+        self.order = OrderedDict()
+        self.by_trigger = {}
+
+    def add(self, nogood):
+        nogood = frozenset(nogood)
+        if not nogood or nogood in self.order or not self.limit:
+            return
+        if len(self.order) >= self.limit:
+            old, trigger = self.order.popitem(last=False)
+            self.by_trigger[trigger].discard(old)
+        trigger = max(nogood)
+        self.order[nogood] = trigger
+        self.by_trigger.setdefault(trigger, set()).add(nogood)
+
+    def violated(self, cell, value, values):
+        """A nogood completed by cell=value under the current `values`, or None"""
+        for nogood in self.by_trigger.get((cell, value), ()):
+            if all(values[other] == v for other, v in nogood if other != cell):
+                return nogood
+        return None
+
+    def __len__(self):
+        return len(self.order)
+
+
+def _backjumping_search(board, steps_counter, states, nogood_limit, should_stop):
+    """Backtracking with conflict-directed backjumping and nogood learning.
+
+    Every variable keeps a conflict set: the earlier variables whose values
+    ruled out one of its own. When its values run out the search jumps
+    straight back to the latest of them, skipping the variables in between
+    that had nothing to do with the failure, and the values of the conflict
+    set are remembered as a nogood. When `should_stop` fires the search
+    unwinds, taking its digits back off the board.
+    """
+    values = [int(v) for row in board.get_board_state() for v in row]
+    variables = [i for i in range(CELL_COUNT) if not values[i]]
+    depth_of = {cell: depth for depth, cell in enumerate(variables)}
+    nogoods = NogoodTable(nogood_limit)
+
+    def culprits(cell, value):
+        """Depths explaining why `value` is impossible in `cell`; None if it is possible"""
+        conflict = None
+        for peer in PEERS[cell]:
+            if values[peer] == value:
+                depth = depth_of.get(peer)
+                if depth is None:
+                    # Ruled out by a given: nobody to blame
+                    return set()
+                if conflict is None or depth < conflict:
+                    conflict = depth
+        if conflict is not None:
+            return {conflict}
+        nogood = nogoods.violated(cell, value, values)
+        if nogood is not None:
+            return {depth_of[other] for other, _ in nogood if other != cell}
+        return None
+
+    def backtrack(depth):
+        """True once solved, None once stopped, otherwise the conflict set to jump back with"""
+        if depth == len(variables):
+            return True
+        cell = variables[depth]
+        row, col = divmod(cell, 9)
+        conflict_set = set()
+
+        for value in range(1, 10):
+            if should_stop is not None and should_stop():
+                return None
+            if steps_counter is not None:
+                steps_counter[0] += 1
+            blame = culprits(cell, value)
+            if blame is not None:
+                conflict_set |= blame
+                continue
+
+            values[cell] = value
+            board.set_value(row, col, value)
+            if states is not None:
+                states.append(board.get_board_state().copy())
+            result = backtrack(depth + 1)
+            values[cell] = 0
+            if result is True:
+                return True
+            board.set_value(row, col, 0)
+            if states is not None:
+                states.append(board.get_board_state().copy())
+            if result is None:
+                return None
+            if depth not in result:
+                # The failure below does not involve this variable: jump over it
+                return result
+            conflict_set |= result - {depth}
+
+        nogoods.add((variables[d], values[variables[d]]) for d in conflict_set)
+        return conflict_set
+
+    return backtrack(0) is True
+
+
+# Node budget of a restart run: run k may expand RESTART_UNIT * luby(k) nodes
+RESTART_UNIT = 100
+# Activity bumps grow by 1 / ACTIVITY_DECAY, so older conflicts weigh less
+ACTIVITY_DECAY = 0.95
+
+
+def luby(i):
+    """i-th term (from 1) of the Luby sequence 1, 1, 2, 1, 1, 2, 4, 1, 1, 2, ..."""
+    k = i.bit_length()
+    while i != (1 << k) - 1:
+        i -= (1 << (k - 1)) - 1
+        k = i.bit_length()
+    return 1 << (k - 1)
+
+
+def _restarting_search(board, steps_counter, states, rng, restart_unit, should_stop):
+    """Randomised backtracking restarted on a Luby schedule.
+
+    Variables are picked by fewest candidates, ties going to the highest
+    activity; a variable's activity is bumped every time it runs out of
+    values and survives restarts, so later runs branch on the trouble
+    spots first. Values are tried in random order. A run that exceeds its
+    node budget is unwound and the next one starts from the root.
+    """
+    unassigned = [i for i in range(CELL_COUNT) if not board.get_value(i // 9, i % 9)]
+    activity = [0.0] * CELL_COUNT
+    increment = [1.0]
+
+    def bump(cell):
+        activity[cell] += increment[0]
+        increment[0] /= ACTIVITY_DECAY
+        if increment[0] > 1e100:
+            for i in range(CELL_COUNT):
+                activity[i] *= 1e-100
+            increment[0] *= 1e-100
+
+    def run(budget):
+        """True if solved, False if the board has no solution, None if cut off"""
+        nodes = [0]
+
+        def backtrack():
+            if not unassigned:
+                return True
+            best, best_mask, best_key = None, 0, None
+            for cell in unassigned:
+                mask = board.get_candidate_mask(cell // 9, cell % 9)
+                key = (mask.bit_count(), -activity[cell])
+                if best_key is None or key < best_key:
+                    best, best_mask, best_key = cell, mask, key
+            row, col = divmod(best, 9)
+
+            digits = [d for d in range(1, 10) if best_mask >> d & 1]
+            rng.shuffle(digits)
+            unassigned.remove(best)
+            for value in digits:
+                if nodes[0] >= budget or (should_stop is not None and should_stop()):
+                    unassigned.append(best)
+                    return None
+                nodes[0] += 1
+                if steps_counter is not None:
+                    steps_counter[0] += 1
+
+                board.set_value(row, col, value)
+                if states is not None:
+                    states.append(board.get_board_state().copy())
+                result = backtrack()
+                if result:
+                    return True
+                board.set_value(row, col, 0)
+                if states is not None:
+                    states.append(board.get_board_state().copy())
+                if result is None:
+                    unassigned.append(best)
+                    return None
+            unassigned.append(best)
+            bump(best)
+            return False
+
+        return backtrack()
+
+    run_index = 1
+    while True:
+        result = run(restart_unit * luby(run_index))
+        if result is not None:
+            return result
+        if should_stop is not None and should_stop():
+            return False
+        run_index += 1
+
+
+def backtracking_search(board, steps_counter=None, states=None, passes=None,
+                        backjumping=False, nogood_limit=NOGOOD_LIMIT,
+                        restarts=False, rng=random, restart_unit=RESTART_UNIT, should_stop=None):
+    """Chronological backtracking search.
+
+    With `passes` (see propagation.PASSES) the board is propagated to a
+    fixpoint before every branching decision and the deduced digits are
+    cleared again on backtrack. With `backjumping` the search jumps back to
+    the variable that caused a failure instead and learns up to
+    `nogood_limit` nogoods. With `restarts` the search is randomised with
+    `rng` and restarted on a Luby schedule of `restart_unit` nodes. At most
+    one of the three options can be used. `should_stop` is polled once per
+    value tried; a stopped search returns False with the board restored.
+    """
+    if sum((passes is not None, backjumping, restarts)) > 1:
+        raise ValueError("propagation passes, backjumping and restarts cannot be combined")
+    if backjumping:
+        return _backjumping_search(board, steps_counter, states, nogood_limit, should_stop)
+    if restarts:
+        return _restarting_search(board, steps_counter, states, rng, restart_unit, should_stop)
+
     def backtrack(assignment):
         if len(assignment) == 81:  # All variables assigned
             return True
+
+        filled = []
+        if passes is not None:
+            filled = propagate_board(board, passes, steps_counter, states)
+            if filled is None:
+                return False
             
         # Select unassigned variable
         var = None
@@ -129,30 +401,204 @@ def backtracking_search(board, steps_counter=None, states=None):
             
         # Try each value in the domain
         for value in range(1, 10):
+            if should_stop is not None and should_stop():
+                # Unwind: every level clears its own digits on the way out
+                break
             if steps_counter is not None:
                 steps_counter[0] += 1
                 
             if board.is_valid_move(*var, value):
                 # If value is consistent with constraints
-                if forward_checking(board, var, value, steps_counter):
-                    board.set_value(*var, value)
-                    assignment.append(var)
-                    
-                    # Save state for visualization
-                    if states is not None:
-                        states.append(board.get_board_state().copy())
-                        
-                    result = backtrack(assignment)
-                    if result:
-                        return True
-                    # If no solution found, backtrack
-                    board.set_value(*var, 0)
-                    assignment.pop()
-                    
-                    # Save state after backtracking
-                    if states is not None:
-                        states.append(board.get_board_state().copy())
+                board.set_value(*var, value)
+                assignment.append(var)
+                
+                # Save state for visualization
+                if states is not None:
+                    states.append(board.get_board_state().copy())
                     
+                result = backtrack(assignment)
+                if result:
+                    return True
+                # If no solution found, backtrack
+                board.set_value(*var, 0)
+                assignment.pop()
+                
+                # Save state after backtracking
+                if states is not None:
+                    states.append(board.get_board_state().copy())
+
+        for cell in filled:
+            board.set_value(*cell, 0)
+        if filled and states is not None:
+            states.append(board.get_board_state().copy())
         return False
         
-    return backtrack([]) 
\ No newline at end of file
+    return backtrack([]) 
+
+@lru_cache(maxsize=None)
+def grid_units(size):
+    """Rows, columns and boxes of a size x size grid with sqrt(size) x sqrt(size) boxes"""
+    side = isqrt(size)
+    if side * side != size:
+        raise ValueError(f"grid size {size} is not a perfect square")
+    rows = [tuple(r * size + c for c in range(size)) for r in range(size)]
+    cols = [tuple(r * size + c for r in range(size)) for c in range(size)]
+    boxes = [tuple((br + r) * size + bc + c for r in range(side) for c in range(side))
+             for br in range(0, size, side) for bc in range(0, size, side)]
+    return tuple(rows + cols + boxes)
+
+
+@lru_cache(maxsize=None)
+def grid_peers(size):
+    """Peers of every cell of a size x size grid"""
+    peers = [set() for _ in range(size * size)]
+    for unit in grid_units(size):
+        for cell in unit:
+            peers[cell].update(unit)
+    return tuple(tuple(sorted(group - {cell})) for cell, group in enumerate(peers))
+
+
+def _make_arc_consistent(domains, peers, units, full, queue, trail):
+    """Arc consistency for the all-different constraints, driven by `queue`.
+
+    On the binary arcs (xi, xj) a revise only removes something when xj is
+    down to one value, so only cells whose domain became a singleton are
+    queued. Once that settles, every unit is checked for values that lost
+    all their supports (wipe-out) or kept a single one (the cell is reduced
+    to that value), which is what makes the search scale past 9x9.
+    Changes go on `trail`; returns False on a wipe-out.
+    """
+    while True:
+        while queue:
+            cell = queue.pop()
+            bit = domains[cell]
+            for peer in peers[cell]:
+                domain = domains[peer]
+                if domain & bit:
+                    if domain == bit:
+                        return False
+                    trail.append((peer, domain))
+                    domain &= ~bit
+                    domains[peer] = domain
+                    if not domain & (domain - 1):
+                        queue.append(peer)
+
+        for unit in units:
+            once = twice = 0
+            for cell in unit:
+                domain = domains[cell]
+                twice |= once & domain
+                once |= domain
+            if once != full:
+                return False
+            single = once & ~twice
+            for cell in unit:
+                domain = domains[cell]
+                if domain & single and domain & (domain - 1):
+                    domain &= single
+                    if domain & (domain - 1):
+                        # Two values both need this cell
+                        return False
+                    trail.append((cell, domains[cell]))
+                    domains[cell] = domain
+                    queue.append(cell)
+        if not queue:
+            return True
+
+def mac_solve(grid, steps_counter=None, should_stop=None, on_assign=None, on_unassign=None):
+    """Maintaining Arc Consistency search on a size x size grid (0 = empty).
+
+    Variables are chosen by minimum remaining values with the number of
+    unassigned peers (degree) as tie-break, and values are tried least
+    constraining first. After every assignment the whole grid is made arc
+    consistent again. Returns the solved grid as a list of rows, or None.
+    """
+    size = len(grid)
+    peers = grid_peers(size)
+    units = grid_units(size)
+    full = (1 << (size + 1)) - 2
+    values = [int(v) for row in grid for v in row]
+    domains = [1 << v if v else full for v in values]
+    trail = []
+    if not _make_arc_consistent(domains, peers, units, full, [i for i, v in enumerate(values) if v], trail):
+        return None
+
+    assigned = [bool(v) for v in values]
+    unassigned = [i for i, v in enumerate(values) if not v]
+
+    def select(depth):
+        """Index in `unassigned` of the next variable (MRV, then degree)"""
+        best, best_size, best_degree = depth, size + 1, -1
+        for k in range(depth, len(unassigned)):
+            count = domains[unassigned[k]].bit_count()
+            if count > best_size:
+                continue
+            if count == 1:
+                return k
+            degree = sum(1 for peer in peers[unassigned[k]] if not assigned[peer])
+            if count < best_size or degree > best_degree:
+                best, best_size, best_degree = k, count, degree
+        return best
+
+    def order_values(cell):
+        """Values of the cell, least constraining (fewest peer domains hit) first"""
+        domain = domains[cell]
+        bits = []
+        while domain:
+            bit = domain & -domain
+            domain ^= bit
+            bits.append(bit)
+        if len(bits) > 1:
+            bits.sort(key=lambda bit: sum(1 for peer in peers[cell]
+                                          if not assigned[peer] and domains[peer] & bit))
+        return bits
+
+    def backtrack(depth):
+        if depth == len(unassigned):
+            return True
+        k = select(depth)
+        unassigned[depth], unassigned[k] = unassigned[k], unassigned[depth]
+        cell = unassigned[depth]
+        row, col = divmod(cell, size)
+        assigned[cell] = True
+
+        for bit in order_values(cell):
+            if should_stop is not None and should_stop():
+                break
+            if steps_counter is not None:
+                steps_counter[0] += 1
+            mark = len(trail)
+            trail.append((cell, domains[cell]))
+            domains[cell] = bit
+            if _make_arc_consistent(domains, peers, units, full, [cell], trail):
+                if on_assign is not None:
+                    on_assign(row, col, bit.bit_length() - 1)
+                if backtrack(depth + 1):
+                    return True
+                if on_unassign is not None:
+                    on_unassign(row, col)
+            restore_domains(domains, trail, mark)
+
+        assigned[cell] = False
+        return False
+
+    if not backtrack(0):
+        return None
+    solution = [domain.bit_length() - 1 for domain in domains]
+    return [solution[r * size:(r + 1) * size] for r in range(size)]
+
+
+def mac_search(board, steps_counter=None, states=None, should_stop=None):
+    """Solve the board with MAC, replaying every assignment on it"""
+    def on_assign(row, col, value):
+        board.set_value(row, col, value)
+        if states is not None:
+            states.append(board.get_board_state().copy())
+
+    def on_unassign(row, col):
+        board.set_value(row, col, 0)
+        if states is not None:
+            states.append(board.get_board_state().copy())
+
+    return mac_solve(board.get_board_state(), steps_counter, should_stop,
+                     on_assign, on_unassign) is not None
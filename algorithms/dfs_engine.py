@@ -0,0 +1,137 @@
+from utils.state_key import CELL_COUNT, PackedFrontier, unpack_state
+
+
+class DepthFirstEngine:
+    """Depth-first search over a single board mutated in place.
+
+    Each node fills the first empty cell (row-major) with one of its
+    candidates, highest digit first, which is the order the stack-based
+    searches used to pop their children in. Moves are kept on an undo
+    trail and taken back with board.set_value(row, col, 0), so no child
+    boards are ever built; a node's candidates come straight from the
+    board's bitmasks. The search tree has no repeated states, so no
+    visited set is needed either.
+
+    iterative_deepening() runs searches of growing depth limit, resuming
+    each one from the cutoff nodes of the previous one while they fit in
+    memory.
+    """
+
+    def __init__(self, board, states=None, should_stop=None):
+        self.board = board
+        self.states = states
+        self.should_stop = should_stop
+        self.nodes = 0
+        self.cutoff = False    # some node was not expanded because of the depth limit
+        self.stopped = False   # should_stop() interrupted the last search
+        self.frontier = None   # where cutoff nodes are collected, packed
+        self.frontier_limit = 0
+
+    def _visit(self):
+        """Count and record the current node; True if the board is full"""
+        self.nodes += 1
+        if self.states is not None:
+            self.states.append(self.board.get_board_state())
+        return self.board.find_empty() is None
+
+    def _cut(self):
+        """Note that the current node was cut off, collecting it while the frontier fits"""
+        self.cutoff = True
+        if self.frontier is not None:
+            self.frontier.append(self.board.get_packed_state())
+            if self.frontier.nbytes() > self.frontier_limit:
+                self.frontier = None
+
+    def _frame(self):
+        """(row, col, candidates to try) for the first empty cell of the board"""
+        row, col = self.board.find_empty()
+        mask = self.board.get_candidate_mask(row, col)
+        return row, col, [num for num in range(9, 0, -1) if mask >> num & 1]
+
+    def search(self, depth_limit=None, resume=False):
+        """Run one search from the current board.
+
+        Returns True with the solution left on the board, otherwise False
+        with the board restored. Nodes at `depth_limit` are not expanded.
+        With resume=True the current board is a cutoff node of an earlier
+        search: it has already been visited, so it is only expanded.
+        """
+        board = self.board
+        self.cutoff = False
+        self.stopped = False
+        if not resume and self._visit():
+            return True
+        if depth_limit is not None and depth_limit <= 0:
+            self._cut()
+            return False
+
+        frames = [self._frame()]
+        while frames:
+            if self.should_stop is not None and self.should_stop():
+                self.stopped = True
+                break
+            row, col, candidates = frames[-1]
+            if not candidates:
+                frames.pop()
+                if frames:
+                    parent_row, parent_col, _ = frames[-1]
+                    board.set_value(parent_row, parent_col, 0)
+                continue
+
+            board.set_value(row, col, candidates.pop(0))
+            if self._visit():
+                return True
+            if depth_limit is not None and len(frames) >= depth_limit:
+                self._cut()
+                board.set_value(row, col, 0)
+                continue
+            frames.append(self._frame())
+
+        # Take back whatever is still placed
+        for row, col, _ in frames[:-1]:
+            board.set_value(row, col, 0)
+        return False
+
+    def iterative_deepening(self, frontier_limit=0):
+        """Searches with depth limits 0, 1, 2, ... until the board is solved.
+
+        The cutoff nodes of each search are kept, packed, as long as they
+        take at most `frontier_limit` bytes; the next search then expands
+        only those nodes, one level deeper, instead of starting again from
+        the root. When a frontier outgrows the limit it is dropped and the
+        searches resume from the last one that fitted, re-expanding the
+        levels below it. frontier_limit=0 is plain iterative deepening.
+        Returns True with the solution on the board, otherwise False with
+        the board restored.
+        """
+        board = self.board
+        start_state = board.get_board_state()
+        base = None        # cutoff nodes the searches resume from; None is the root
+        base_depth = 0
+        for depth_limit in range(CELL_COUNT + 1):
+            if self.should_stop is not None and self.should_stop():
+                break
+            self.frontier = PackedFrontier() if frontier_limit else None
+            self.frontier_limit = frontier_limit
+            if base is None:
+                found = self.search(depth_limit)
+                cutoff = self.cutoff
+            else:
+                found = cutoff = False
+                for packed in base:
+                    board.set_board_state(unpack_state(packed))
+                    found = self.search(depth_limit - base_depth, resume=True)
+                    cutoff = cutoff or self.cutoff
+                    if found or self.stopped:
+                        break
+            if found:
+                self.frontier = None
+                return True
+            if self.stopped or not cutoff:
+                # Interrupted, or the whole tree fitted within the limit
+                break
+            if self.frontier is not None:
+                base, base_depth = self.frontier, depth_limit
+        self.frontier = None
+        board.set_board_state(start_state)
+        return False
@@ -0,0 +1,57 @@
+from .propagation import (Candidates, hidden_singles, naked_singles, naked_pairs, hidden_pairs,
+                          pointing, box_line_reduction, naked_triples, hidden_triples, x_wing)
+from utils.constants import RATINGS
+
+# Human techniques from easiest to hardest: (name, function, weight, rating)
+# The weight is added to the score every time the technique makes progress.
+TECHNIQUES = [
+    ("Hidden Single", hidden_singles, 1.0, RATINGS[0]),
+    ("Naked Single", naked_singles, 1.5, RATINGS[0]),
+    ("Pointing", pointing, 3.0, RATINGS[1]),
+    ("Box/Line Reduction", box_line_reduction, 3.0, RATINGS[1]),
+    ("Naked Pair", naked_pairs, 4.0, RATINGS[1]),
+    ("Hidden Pair", hidden_pairs, 4.5, RATINGS[1]),
+    ("Naked Triple", naked_triples, 6.0, RATINGS[2]),
+    ("Hidden Triple", hidden_triples, 6.5, RATINGS[2]),
+    ("X-Wing", x_wing, 7.0, RATINGS[2]),
+]
+
+# Charged when no technique applies and the solver would have to guess
+GUESSING = ("Trial and Error", 20.0, RATINGS[3])
+
+
+def rate_puzzle(grid):
+    """Rate a puzzle by solving it with human techniques, easiest first.
+
+    After every successful technique the solver starts again from the
+    easiest one, so harder techniques are only used when really needed.
+    Returns a dict with the hardest technique used, its rating, a numeric
+    score and how often each technique was applied. A puzzle that the
+    techniques cannot finish is rated as needing trial and error.
+    """
+    cands = Candidates(grid)
+    counts = {}
+    hardest = None
+    hardest_level = -1
+    score = 0.0
+
+    while not cands.contradiction and not cands.is_solved():
+        for level, (name, technique, weight, _) in enumerate(TECHNIQUES):
+            if technique(cands):
+                counts[name] = counts.get(name, 0) + 1
+                score += weight
+                if level > hardest_level:
+                    hardest, hardest_level = name, level
+                break
+        else:
+            break
+
+    if cands.contradiction:
+        return {"technique": None, "rating": None, "score": None, "counts": counts, "solved": False}
+
+    if cands.is_solved():
+        rating = TECHNIQUES[hardest_level][3] if hardest is not None else RATINGS[0]
+        return {"technique": hardest, "rating": rating, "score": score, "counts": counts, "solved": True}
+
+    name, weight, rating = GUESSING
+    return {"technique": name, "rating": rating, "score": score + weight, "counts": counts, "solved": False}
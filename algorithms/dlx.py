@@ -0,0 +1,239 @@
+import numpy as np
+
+# Exact-cover columns: 81 cells, 81 row-digits, 81 column-digits, 81 box-digits
+CELL_CONSTRAINT = 0
+ROW_CONSTRAINT = 81
+COL_CONSTRAINT = 162
+BOX_CONSTRAINT = 243
+NUM_CONSTRAINTS = 324
+
+
+class SearchStopped(Exception):
+    """Raised inside the search when the caller asks it to stop"""
+
+
+class DancingLinks:
+    """Knuth's Algorithm X on a toroidal doubly-linked list (Dancing Links).
+
+    Only the candidates that are consistent with the givens become rows of
+    the exact-cover matrix, and constraints already satisfied by the givens
+    are left out, so the matrix is small for well-clued puzzles.
+    Nodes are stored in flat lists (L, R, U, D, C) rather than objects.
+    """
+
+    def __init__(self, grid):
+        grid = [[int(v) for v in row] for row in grid]
+        self.grid = grid
+        self.consistent = True
+        self.nodes = 0
+
+        # Digits already used by the givens in each row/column/box
+        rows_used = [0] * 9
+        cols_used = [0] * 9
+        boxes_used = [0] * 9
+        for r in range(9):
+            for c in range(9):
+                d = grid[r][c]
+                if d:
+                    bit = 1 << d
+                    b = (r // 3) * 3 + c // 3
+                    if (rows_used[r] | cols_used[c] | boxes_used[b]) & bit:
+                        self.consistent = False
+                    rows_used[r] |= bit
+                    cols_used[c] |= bit
+                    boxes_used[b] |= bit
+
+        # Header 0 is the root, headers 1..324 are the constraints
+        # (only the unsatisfied ones are linked into the header list)
+        size = NUM_CONSTRAINTS + 1
+        self.L = L = list(range(-1, size - 1))
+        self.R = R = list(range(1, size + 1))
+        self.U = U = list(range(size))
+        self.D = D = list(range(size))
+        self.C = C = list(range(size))
+        self.S = S = [0] * size
+        self.choice = choice = [None] * size
+
+        satisfied = [False] * size
+        for r in range(9):
+            for c in range(9):
+                d = grid[r][c]
+                if d:
+                    b = (r // 3) * 3 + c // 3
+                    for column in _columns(r, c, b, d):
+                        satisfied[column] = True
+
+        previous = 0
+        for column in range(1, size):
+            if satisfied[column]:
+                continue
+            R[previous] = column
+            L[column] = previous
+            previous = column
+        R[previous] = 0
+        L[0] = previous
+
+        for r in range(9):
+            for c in range(9):
+                if grid[r][c]:
+                    continue
+                b = (r // 3) * 3 + c // 3
+                used = rows_used[r] | cols_used[c] | boxes_used[b]
+                for d in range(1, 10):
+                    if used >> d & 1:
+                        continue
+                    first = len(C)
+                    for k, column in enumerate(_columns(r, c, b, d)):
+                        node = first + k
+                        # Vertical links: append at the bottom of the column
+                        U.append(U[column])
+                        D.append(column)
+                        D[U[column]] = node
+                        U[column] = node
+                        # Horizontal links: circular list of the 4 nodes
+                        L.append(first + (k - 1) % 4)
+                        R.append(first + (k + 1) % 4)
+                        C.append(column)
+                        choice.append((r, c, d))
+                        S[column] += 1
+
+    def _cover(self, column):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        L[R[column]] = L[column]
+        R[L[column]] = R[column]
+        i = D[column]
+        while i != column:
+            j = R[i]
+            while j != i:
+                U[D[j]] = U[j]
+                D[U[j]] = D[j]
+                S[C[j]] -= 1
+                j = R[j]
+            i = D[i]
+
+    def _uncover(self, column):
+        L, R, U, D, C, S = self.L, self.R, self.U, self.D, self.C, self.S
+        i = U[column]
+        while i != column:
+            j = L[i]
+            while j != i:
+                S[C[j]] += 1
+                U[D[j]] = j
+                D[U[j]] = j
+                j = L[j]
+            i = U[i]
+        L[R[column]] = column
+        R[L[column]] = column
+
+    def solve(self, limit=1, on_place=None, on_remove=None, should_stop=None):
+        """Search for up to `limit` solutions and return them as 9x9 lists.
+
+        on_place(row, col, num) / on_remove(row, col) are called whenever a
+        candidate is chosen or undone, should_stop() is polled once per node.
+        """
+        solutions = []
+        if not self.consistent:
+            return solutions
+
+        R, D, C, S, choice = self.R, self.D, self.C, self.S, self.choice
+        cover, uncover = self._cover, self._uncover
+        partial = []
+
+        def search():
+            if R[0] == 0:
+                solution = [row[:] for row in self.grid]
+                for r, c, d in partial:
+                    solution[r][c] = d
+                solutions.append(solution)
+                return len(solutions) >= limit
+
+            # Column with the fewest remaining rows (Knuth's S heuristic)
+            column = R[0]
+            best = column
+            best_size = S[column]
+            while column != 0 and best_size > 1:
+                if S[column] < best_size:
+                    best = column
+                    best_size = S[column]
+                column = R[column]
+            if best_size == 0:
+                return False
+
+            cover(best)
+            node = D[best]
+            while node != best:
+                self.nodes += 1
+                if should_stop is not None and should_stop():
+                    raise SearchStopped
+                r, c, d = choice[node]
+                partial.append(choice[node])
+                if on_place is not None:
+                    on_place(r, c, d)
+
+                j = R[node]
+                while j != node:
+                    cover(C[j])
+                    j = R[j]
+                if search():
+                    return True
+                j = self.L[node]
+                while j != node:
+                    uncover(C[j])
+                    j = self.L[j]
+
+                partial.pop()
+                if on_remove is not None:
+                    on_remove(r, c)
+                node = D[node]
+            uncover(best)
+            return False
+
+        try:
+            search()
+        except SearchStopped:
+            pass
+        return solutions
+
+
+def _columns(r, c, b, d):
+    return (
+        1 + CELL_CONSTRAINT + r * 9 + c,
+        1 + ROW_CONSTRAINT + r * 9 + d - 1,
+        1 + COL_CONSTRAINT + c * 9 + d - 1,
+        1 + BOX_CONSTRAINT + b * 9 + d - 1,
+    )
+
+
+def solve_grid(grid):
+    """Return the first solution of a grid as a NumPy array, or None"""
+    solutions = DancingLinks(grid).solve(limit=1)
+    if not solutions:
+        return None
+    return np.array(solutions[0], dtype=int)
+
+
+def dlx_search(board, steps_counter=None, states=None, should_stop=None):
+    """Solve the board with Dancing Links and write the solution into it"""
+    start_state = board.get_board_state()
+    dlx = DancingLinks(start_state)
+
+    on_place = on_remove = None
+    if states is not None:
+        trace = start_state.copy()
+
+        def on_place(row, col, num):
+            trace[row][col] = num
+            states.append(trace.copy())
+
+        def on_remove(row, col):
+            trace[row][col] = 0
+            states.append(trace.copy())
+
+    solutions = dlx.solve(limit=1, on_place=on_place, on_remove=on_remove, should_stop=should_stop)
+    if steps_counter is not None:
+        steps_counter[0] += dlx.nodes
+    if not solutions:
+        return False
+
+    board.set_board_state(np.array(solutions[0], dtype=int))
+    return True
@@ -0,0 +1,135 @@
+import math
+from utils.grid_tables import PEERS
+
+# Cost-to-go of a board that can no longer be completed
+DEAD_END = math.inf
+
+# log2 of every possible domain size, so updates never call math.log2
+_LOG2 = [0.0] + [math.log2(k) for k in range(1, 10)]
+
+
+class Heuristic:
+    """A heuristic that can be evaluated on a board or updated from its parent.
+
+    `evaluate(board)` computes the value from scratch. `update(board, value,
+    row, col, num)` returns the value of the child obtained by placing num
+    at (row, col), given the parent's `value` and the parent board (before
+    the placement): only the cell and its 20 peers are looked at.
+    """
+
+    name = None
+
+    def evaluate(self, board):
+        raise NotImplementedError
+
+    def update(self, board, value, row, col, num):
+        raise NotImplementedError
+
+
+def _empty_peers_losing(board, row, col, num):
+    """Candidate masks of the empty peers that lose num when it is placed at (row, col)"""
+    bit = 1 << num
+    masks = []
+    grid = board.board
+    for peer in PEERS[row * 9 + col]:
+        r, c = divmod(peer, 9)
+        if not grid[r][c]:
+            mask = board.get_candidate_mask(r, c)
+            if mask & bit:
+                masks.append(mask)
+    return masks
+
+
+class EmptyCells(Heuristic):
+    """Number of empty cells"""
+
+    name = "Empty Cells"
+
+    def evaluate(self, board):
+        return board.count_empty()
+
+    def update(self, board, value, row, col, num):
+        return value - 1
+
+
+class LogDomainSum(Heuristic):
+    """Sum of log2(candidate count) over the empty cells: the bits still to guess"""
+
+    name = "Log Domain Sum"
+
+    def evaluate(self, board):
+        total = 0.0
+        for row, col in board.get_empty_cells():
+            count = board.get_candidate_mask(row, col).bit_count()
+            if not count:
+                return DEAD_END
+            total += _LOG2[count]
+        return total
+
+    def update(self, board, value, row, col, num):
+        if value == DEAD_END:
+            return DEAD_END
+        value -= _LOG2[board.get_candidate_mask(row, col).bit_count()]
+        for mask in _empty_peers_losing(board, row, col, num):
+            count = mask.bit_count()
+            if count == 1:
+                return DEAD_END
+            value += _LOG2[count - 1] - _LOG2[count]
+        return max(value, 0.0)
+
+
+class ForcedCells(Heuristic):
+    """Empty cells minus those forced to a single candidate, so boards with
+    more forced cells rank first"""
+
+    name = "Forced Cells"
+
+    def evaluate(self, board):
+        total = 0
+        for row, col in board.get_empty_cells():
+            if board.get_candidate_mask(row, col).bit_count() != 1:
+                total += 1
+        return total
+
+    def update(self, board, value, row, col, num):
+        if board.get_candidate_mask(row, col).bit_count() != 1:
+            value -= 1
+        for mask in _empty_peers_losing(board, row, col, num):
+            count = mask.bit_count()
+            if count == 2:
+                value -= 1
+            elif count == 1:
+                value += 1
+        return value
+
+
+class LowerBound(Heuristic):
+    """Admissible cost-to-go: every empty cell still needs one placement, and a
+    board where some empty cell has no candidate left can never be finished"""
+
+    name = "Lower Bound"
+
+    def evaluate(self, board):
+        for row, col in board.get_empty_cells():
+            if not board.get_candidate_mask(row, col):
+                return DEAD_END
+        return board.count_empty()
+
+    def update(self, board, value, row, col, num):
+        if value == DEAD_END:
+            return DEAD_END
+        for mask in _empty_peers_losing(board, row, col, num):
+            if mask.bit_count() == 1:
+                return DEAD_END
+        return value - 1
+
+
+HEURISTICS = {h.name: h for h in (EmptyCells(), LogDomainSum(), ForcedCells(), LowerBound())}
+DEFAULT_HEURISTIC = EmptyCells.name
+
+
+def heuristic_by_name(name=DEFAULT_HEURISTIC):
+    """The heuristic registered under `name`"""
+    if name not in HEURISTICS:
+        raise ValueError(f"unknown heuristic {name!r}; choose from {', '.join(HEURISTICS)}")
+    return HEURISTICS[name]
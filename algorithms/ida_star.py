@@ -0,0 +1,120 @@
+from utils.state_key import BoundedTable
+from .heuristics import DEAD_END
+
+# Boards whose proven cost-to-go the transposition table remembers
+TRANSPOSITION_LIMIT = 100000
+
+# Nodes a bounded contour may expand before the next contour runs unbounded
+CONTOUR_NODE_LIMIT = 500
+
+
+class IterativeDeepeningAStar:
+    """IDA* over a single board mutated in place.
+
+    The cost of a path is the number of guesses on it: expanding a cell
+    with more than one live candidate costs 1, a forced placement costs 0.
+    h is a lower bound on the guesses still needed, 0 until a contour has
+    proven more: the transposition table remembers, for each exhausted
+    board, the smallest cost-to-go its contour proved, so later contours
+    cut the subtrees earlier ones refuted at their root. The first contour
+    (bound 0) only follows forced placements, and each one after allows
+    the fewest extra guesses that reach a new node.
+
+    The selected heuristic (a heuristics.Heuristic, updated incrementally
+    from parent to child) does not enter f: it drops dead-end children and
+    orders the rest, smallest value first. A board with few clues needs
+    more guesses than contours can enumerate, so once a contour expands
+    more than `contour_limit` nodes the next one runs without a bound,
+    which makes it a depth-first search in heuristic order.
+
+    Nodes expand their most constrained cell and moves are undone in
+    place, so memory is the recursion stack plus the table, a
+    BoundedTable of `table_limit` entries.
+    """
+
+    def __init__(self, board, heuristic, states=None, should_stop=None, exact_keys=False,
+                 table_limit=TRANSPOSITION_LIMIT, contour_limit=CONTOUR_NODE_LIMIT):
+        self.board = board
+        self.heuristic = heuristic
+        self.states = states
+        self.should_stop = should_stop
+        self.exact_keys = exact_keys
+        self.table = BoundedTable(table_limit)
+        self.contour_limit = contour_limit
+        self.nodes = 0
+        self.iterations = 0
+        self.solved = False
+        self.stopped = False
+
+    def _key(self):
+        board = self.board
+        return board.get_packed_state() if self.exact_keys else board.get_state_key()
+
+    def _contour(self, g, h, bound):
+        """Search below the current board up to f = bound; h is the heuristic's value.
+
+        Returns the smallest f beyond the bound met on the way (DEAD_END if
+        there is none); sets self.solved with the solution on the board.
+        """
+        board = self.board
+        self.nodes += 1
+        if self.states is not None:
+            self.states.append(board.get_board_state())
+
+        key = self._key()
+        f = g + self.table.get(key, 0)
+        if f > bound or f == DEAD_END:
+            return f
+        pos = board.find_most_constrained_empty()
+        if pos is None:
+            self.solved = True
+            return f
+        if self.should_stop is not None and self.should_stop():
+            self.stopped = True
+            return DEAD_END
+
+        row, col = pos
+        children = []
+        for num in board.get_candidates(row, col):
+            child_h = self.heuristic.update(board, h, row, col, num)
+            if child_h != DEAD_END:
+                children.append((child_h, num))
+        children.sort()
+        # Only a choice between several live candidates is a guess
+        cost = 1 if len(children) > 1 else 0
+
+        exceeded = DEAD_END
+        for child_h, num in children:
+            board.set_value(row, col, num)
+            t = self._contour(g + cost, child_h, bound)
+            if self.solved:
+                return t
+            board.set_value(row, col, 0)
+            exceeded = min(exceeded, t)
+            if self.stopped:
+                return exceeded
+        self.table.put(key, exceeded - g)
+        return exceeded
+
+    def search(self):
+        """Run contours of growing bound until the board is solved.
+
+        Returns True with the solution left on the board, otherwise False
+        with the board restored.
+        """
+        h = self.heuristic.evaluate(self.board)
+        if h == DEAD_END:
+            return False
+        self.solved = False
+        self.stopped = False
+        bound = 0
+        while True:
+            self.iterations += 1
+            nodes = self.nodes
+            bound = self._contour(0, h, bound)
+            if self.solved:
+                return True
+            if self.stopped or bound == DEAD_END:
+                return False
+            if self.nodes - nodes > self.contour_limit:
+                bound = DEAD_END
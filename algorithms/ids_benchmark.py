@@ -0,0 +1,63 @@
+import argparse
+import time
+from algorithms.dfs_engine import DepthFirstEngine
+from game.puzzle_batch import generate_puzzles
+from game.sudoku_board import SudokuBoard
+from utils.constants import DIFFICULTY_LEVELS, IDS_FRONTIER_LIMIT, SOLVE_TIMEOUT
+from utils.state_key import pack_state
+
+
+class VisitLog:
+    """Stands in for the recorded states list: counts visits and distinct boards"""
+
+    def __init__(self):
+        self.visits = 0
+        self.distinct = set()
+
+    def append(self, state):
+        self.visits += 1
+        self.distinct.add(pack_state(state))
+
+
+def measure(puzzle, frontier_limit, timeout=SOLVE_TIMEOUT):
+    """Run iterative deepening on one puzzle; returns (solved, visits, distinct boards, seconds)"""
+    board = SudokuBoard(generate=False)
+    board.load_puzzle(puzzle)
+    log = VisitLog()
+    start = time.time()
+    engine = DepthFirstEngine(board, log, lambda: time.time() - start > timeout)
+    solved = engine.iterative_deepening(frontier_limit)
+    return solved, log.visits, len(log.distinct), time.time() - start
+
+
+def run(difficulties, count, frontier_limit, timeout, workers=None, seed=None):
+    """Print visits, distinct boards and re-expansion ratio with and without the frontier cache"""
+    print(f"{'difficulty':<10} {'mode':<8} {'solved':>6} {'visits':>10} {'distinct':>10} {'ratio':>6} {'time':>7}")
+    for difficulty in difficulties:
+        puzzles = list(generate_puzzles(count, difficulty, workers=workers, seed=seed))
+        for mode, limit in (("restart", 0), ("resume", frontier_limit)):
+            solved = visits = distinct = 0
+            seconds = 0.0
+            for puzzle in puzzles:
+                ok, v, d, t = measure(puzzle, limit, timeout)
+                solved += ok
+                visits += v
+                distinct += d
+                seconds += t
+            ratio = visits / distinct if distinct else 0.0
+            print(f"{difficulty:<10} {mode:<8} {solved:>3}/{len(puzzles):<2} {visits:>10} {distinct:>10} "
+                  f"{ratio:>6.2f} {seconds:>6.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Node re-expansion of Iterative Deepening Search with and without the frontier cache")
+    parser.add_argument("difficulties", nargs="*", default=list(DIFFICULTY_LEVELS))
+    parser.add_argument("--count", type=int, default=5, help="puzzles per difficulty")
+    parser.add_argument("--frontier-limit", type=int, default=IDS_FRONTIER_LIMIT, help="bytes of cached frontier")
+    parser.add_argument("--timeout", type=float, default=SOLVE_TIMEOUT, help="seconds per puzzle and mode")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    run(args.difficulties, args.count, args.frontier_limit, args.timeout, workers=args.workers, seed=args.seed)
@@ -0,0 +1,347 @@
+from itertools import combinations
+from utils.grid_tables import (ALL_DIGITS, CELL_COUNT, UNITS, ROW_UNITS, COL_UNITS, BOX_UNITS,
+                               ROW_OF, COL_OF, BOX_OF, PEERS)
+
+
+class Candidates:
+    """Candidate digits of every cell of a 9x9 grid, stored as bitmasks (bit n = digit n).
+
+    Techniques only ever remove candidates or place digits. When a cell runs
+    out of candidates, or a digit has no place left in a unit, `contradiction`
+    is set and the grid cannot be solved from here.
+    """
+
+    def __init__(self, grid):
+        self.values = [int(v) for row in grid for v in row]
+        self.masks = [ALL_DIGITS] * CELL_COUNT
+        self.contradiction = False
+
+        rows = [0] * 9
+        cols = [0] * 9
+        boxes = [0] * 9
+        for i, d in enumerate(self.values):
+            if d:
+                bit = 1 << d
+                r, c, b = ROW_OF[i], COL_OF[i], BOX_OF[i]
+                if (rows[r] | cols[c] | boxes[b]) & bit:
+                    self.contradiction = True
+                rows[r] |= bit
+                cols[c] |= bit
+                boxes[b] |= bit
+        for i, d in enumerate(self.values):
+            if d:
+                self.masks[i] = 1 << d
+            else:
+                self.masks[i] = ~(rows[ROW_OF[i]] | cols[COL_OF[i]] | boxes[BOX_OF[i]]) & ALL_DIGITS
+                if not self.masks[i]:
+                    self.contradiction = True
+
+    def copy(self):
+        other = Candidates.__new__(Candidates)
+        other.values = self.values[:]
+        other.masks = self.masks[:]
+        other.contradiction = self.contradiction
+        return other
+
+    def place(self, i, digit):
+        """Solve a cell and remove its digit from the peers"""
+        bit = 1 << digit
+        self.values[i] = digit
+        self.masks[i] = bit
+        values, masks = self.values, self.masks
+        for p in PEERS[i]:
+            if masks[p] & bit:
+                masks[p] &= ~bit
+                if not masks[p]:
+                    self.contradiction = True
+            elif values[p] == digit:
+                self.contradiction = True
+
+    def eliminate(self, i, bits):
+        """Remove candidate bits from an unsolved cell; True if anything changed"""
+        mask = self.masks[i]
+        if not mask & bits:
+            return False
+        mask &= ~bits
+        self.masks[i] = mask
+        if not mask:
+            self.contradiction = True
+        return True
+
+    def is_solved(self):
+        return 0 not in self.values
+
+    def unsolved(self, unit):
+        values = self.values
+        return [i for i in unit if not values[i]]
+
+    def to_grid(self):
+        return [self.values[r * 9:(r + 1) * 9] for r in range(9)]
+
+
+def _digit_positions(cands, unit):
+    """For each digit, the bitmask of the positions (0..8) it may take in the unit"""
+    positions = [0] * 10
+    values, masks = cands.values, cands.masks
+    for k, i in enumerate(unit):
+        if values[i]:
+            continue
+        mask = masks[i]
+        while mask:
+            bit = mask & -mask
+            mask ^= bit
+            positions[bit.bit_length() - 1] |= 1 << k
+    return positions
+
+
+def _bits(mask):
+    """Indices of the set bits of a mask"""
+    result = []
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        result.append(bit.bit_length() - 1)
+    return result
+
+
+# Every technique takes a Candidates object, applies all the deductions it
+# finds in one sweep and returns True if it made progress.
+
+def naked_singles(cands):
+    """Cells with a single candidate left"""
+    progress = False
+    values, masks = cands.values, cands.masks
+    for i in range(CELL_COUNT):
+        if not values[i]:
+            mask = masks[i]
+            if mask and not mask & (mask - 1):
+                cands.place(i, mask.bit_length() - 1)
+                progress = True
+    return progress
+
+
+def hidden_singles(cands):
+    """Digits with a single possible position in a unit"""
+    progress = False
+    values, masks = cands.values, cands.masks
+    for unit in UNITS:
+        once = twice = placed = 0
+        for i in unit:
+            if values[i]:
+                placed |= masks[i]
+            else:
+                mask = masks[i]
+                twice |= once & mask
+                once |= mask
+        if (once | placed) != ALL_DIGITS:
+            # Some digit has no place left in this unit
+            cands.contradiction = True
+            return progress
+        hidden = once & ~twice & ~placed
+        while hidden:
+            bit = hidden & -hidden
+            hidden ^= bit
+            for i in unit:
+                if not values[i] and masks[i] & bit:
+                    cands.place(i, bit.bit_length() - 1)
+                    progress = True
+                    break
+    return progress
+
+
+def _naked_subsets(cands, size):
+    progress = False
+    masks = cands.masks
+    for unit in UNITS:
+        cells = [i for i in cands.unsolved(unit) if masks[i].bit_count() <= size]
+        if len(cells) < size:
+            continue
+        for subset in combinations(cells, size):
+            union = 0
+            for i in subset:
+                union |= masks[i]
+            if union.bit_count() != size:
+                continue
+            for i in cands.unsolved(unit):
+                if i not in subset and cands.eliminate(i, union):
+                    progress = True
+    return progress
+
+
+def _hidden_subsets(cands, size):
+    progress = False
+    for unit in UNITS:
+        positions = _digit_positions(cands, unit)
+        digits = [d for d in range(1, 10) if 2 <= positions[d].bit_count() <= size]
+        if len(digits) < size:
+            continue
+        for subset in combinations(digits, size):
+            where = 0
+            keep = 0
+            for d in subset:
+                where |= positions[d]
+                keep |= 1 << d
+            if where.bit_count() != size:
+                continue
+            for k in _bits(where):
+                if cands.eliminate(unit[k], ALL_DIGITS & ~keep):
+                    progress = True
+    return progress
+
+
+def naked_pairs(cands):
+    """Two cells of a unit sharing the same two candidates"""
+    return _naked_subsets(cands, 2)
+
+
+def hidden_pairs(cands):
+    """Two digits confined to the same two cells of a unit"""
+    return _hidden_subsets(cands, 2)
+
+
+def naked_triples(cands):
+    return _naked_subsets(cands, 3)
+
+
+def hidden_triples(cands):
+    return _hidden_subsets(cands, 3)
+
+
+# Positions (0..8) of a unit grouped in threes: a box row / a line segment,
+# and a box column
+_TRIPLE_MASKS = [0b111 << (3 * j) for j in range(3)]
+_BOX_COL_MASKS = [0b001001001 << j for j in range(3)]
+
+
+def pointing(cands):
+    """A digit confined to one row or column inside a box leaves the rest of that line"""
+    progress = False
+    for b, box in enumerate(BOX_UNITS):
+        positions = _digit_positions(cands, box)
+        for digit in range(1, 10):
+            where = positions[digit]
+            if where.bit_count() < 2:
+                continue
+            for j in range(3):
+                if not where & ~_TRIPLE_MASKS[j]:
+                    line = ROW_UNITS[ROW_OF[box[3 * j]]]
+                elif not where & ~_BOX_COL_MASKS[j]:
+                    line = COL_UNITS[COL_OF[box[j]]]
+                else:
+                    continue
+                for i in line:
+                    if BOX_OF[i] != b and not cands.values[i] and cands.eliminate(i, 1 << digit):
+                        progress = True
+    return progress
+
+
+def box_line_reduction(cands):
+    """A digit confined to one box inside a row or column leaves the rest of that box"""
+    progress = False
+    for lines in (ROW_UNITS, COL_UNITS):
+        for line in lines:
+            positions = _digit_positions(cands, line)
+            for digit in range(1, 10):
+                where = positions[digit]
+                if where.bit_count() < 2:
+                    continue
+                for j in range(3):
+                    if where & ~_TRIPLE_MASKS[j]:
+                        continue
+                    for i in BOX_UNITS[BOX_OF[line[3 * j]]]:
+                        if i not in line and not cands.values[i] and cands.eliminate(i, 1 << digit):
+                            progress = True
+    return progress
+
+
+def x_wing(cands):
+    """A digit with the same two positions in two rows (or columns) leaves the crossing lines"""
+    progress = False
+    for base, cover in ((ROW_UNITS, COL_UNITS), (COL_UNITS, ROW_UNITS)):
+        per_line = [_digit_positions(cands, line) for line in base]
+        for digit in range(1, 10):
+            pairs = {}
+            for index, positions in enumerate(per_line):
+                where = positions[digit]
+                if where.bit_count() == 2:
+                    pairs.setdefault(where, []).append(index)
+            for where, lines in pairs.items():
+                if len(lines) < 2:
+                    continue
+                for first, second in combinations(lines, 2):
+                    for k in _bits(where):
+                        for i in cover[k]:
+                            if (i not in base[first] and i not in base[second]
+                                    and not cands.values[i] and cands.eliminate(i, 1 << digit)):
+                                progress = True
+    return progress
+
+
+# Passes by name, easiest first; any subset in any order can be given to propagate()
+PASSES = {
+    "Naked Single": naked_singles,
+    "Hidden Single": hidden_singles,
+    "Pointing": pointing,
+    "Box/Line Reduction": box_line_reduction,
+    "Naked Pair": naked_pairs,
+    "Hidden Pair": hidden_pairs,
+    "Naked Triple": naked_triples,
+    "Hidden Triple": hidden_triples,
+    "X-Wing": x_wing,
+}
+DEFAULT_PASSES = tuple(PASSES.values())
+
+
+def passes_by_name(names):
+    """The passes registered under `names`, in order; pass functions are kept as given"""
+    passes = []
+    for name in names:
+        if callable(name):
+            passes.append(name)
+        elif name in PASSES:
+            passes.append(PASSES[name])
+        else:
+            raise ValueError(f"unknown propagation pass {name!r}; choose from {', '.join(PASSES)}")
+    return tuple(passes)
+
+
+def propagate(cands, passes=DEFAULT_PASSES):
+    """Run the passes to a fixpoint; False if the candidates hit a contradiction.
+
+    After every pass that makes progress the cheaper passes get another go
+    first, so the expensive ones only run when nothing simpler applies.
+    """
+    while not cands.contradiction:
+        for technique in passes:
+            if technique(cands):
+                break
+            if cands.contradiction:
+                return False
+        else:
+            return True
+    return False
+
+
+def propagate_board(board, passes=DEFAULT_PASSES, steps_counter=None, states=None):
+    """Propagate on a SudokuBoard and write every deduced digit onto it.
+
+    Returns the (row, col) cells that were filled, so a search can clear
+    them again when it backtracks, or None if the board is contradictory.
+    Each filled cell counts as one step and is recorded in `states`.
+    """
+    grid = board.get_board_state()
+    cands = Candidates(grid)
+    if cands.contradiction or not propagate(cands, passes):
+        return None
+
+    filled = []
+    for i, value in enumerate(cands.values):
+        row, col = divmod(i, 9)
+        if value and not grid[row][col]:
+            board.set_value(row, col, value)
+            filled.append((row, col))
+            if steps_counter is not None:
+                steps_counter[0] += 1
+            if states is not None:
+                states.append(board.get_board_state().copy())
+    return filled
@@ -17,7 +17,7 @@ class QLearning:
         if not pos:
             return []
         row, col = pos
-        return [num for num in range(1, 10) if board.is_valid_move(row, col, num)]
+        return board.get_candidates(row, col)
         
     def get_reward(self, board):
         """Calculate reward based on number of filled cells and conflicts"""
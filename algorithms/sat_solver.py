@@ -0,0 +1,306 @@
+import heapq
+import numpy as np
+from .csp_algorithms import grid_units, luby
+
+# Conflicts in the first run between restarts; run k allows RESTART_UNIT * luby(k)
+RESTART_UNIT = 64
+# Variable activity bumps grow by 1 / VSIDS_DECAY after every conflict
+VSIDS_DECAY = 0.95
+
+
+def encode(grid):
+    """CNF encoding of a size x size grid (0 = empty), pruned by the givens.
+
+    Only (cell, digit) pairs that no given rules out get a variable. Every
+    empty cell takes exactly one digit and every digit missing from a unit
+    goes to exactly one of its cells. Returns (num_vars, clauses, decode)
+    where clauses are lists of DIMACS-style literals (+v / -v) and
+    decode[v] is the (row, col, digit) of variable v.
+    """
+    size = len(grid)
+    values = [int(v) for row in grid for v in row]
+    units = grid_units(size)
+
+    used = [0] * (size * size)
+    for unit in units:
+        seen = 0
+        for cell in unit:
+            if values[cell]:
+                seen |= 1 << values[cell]
+        for cell in unit:
+            used[cell] |= seen
+
+    var_of = {}
+    decode = [None]
+    for cell, value in enumerate(values):
+        if value:
+            continue
+        for digit in range(1, size + 1):
+            if not used[cell] >> digit & 1:
+                var_of[cell, digit] = len(decode)
+                decode.append((cell // size, cell % size, digit))
+
+    clauses = []
+
+    def exactly_one(variables):
+        clauses.append(list(variables))
+        for i, a in enumerate(variables):
+            for b in variables[i + 1:]:
+                clauses.append([-a, -b])
+
+    for cell, value in enumerate(values):
+        if not value:
+            exactly_one([var_of[cell, d] for d in range(1, size + 1) if (cell, d) in var_of])
+    for unit in units:
+        given = {values[cell] for cell in unit}
+        for digit in range(1, size + 1):
+            if digit not in given:
+                exactly_one([var_of[cell, digit] for cell in unit if (cell, digit) in var_of])
+
+    return len(decode) - 1, clauses, decode
+
+
+class CDCLSolver:
+    """Conflict-driven clause learning SAT solver.
+
+    Unit propagation uses two watched literals per clause, conflicts are
+    analysed to the first unique implication point and the learnt clause
+    drives a non-chronological backjump. Decisions follow VSIDS activity
+    with phase saving, and the search restarts on a Luby schedule while
+    keeping its learnt clauses.
+    """
+
+    def __init__(self, num_vars, clauses):
+        self.num_vars = num_vars
+        self.values = [0] * (num_vars + 1)      # 1 true, -1 false, 0 unassigned
+        self.level = [0] * (num_vars + 1)
+        self.reason = [None] * (num_vars + 1)   # index of the implying clause
+        self.phase = [False] * (num_vars + 1)
+        self.activity = [0.0] * (num_vars + 1)
+        self.var_inc = 1.0
+        self.heap = [(0.0, v) for v in range(1, num_vars + 1)]
+        self.watches = [[] for _ in range(2 * num_vars + 1)]  # indexed by literal + num_vars
+        self.clauses = []
+        self.trail = []
+        self.trail_lim = []
+        self.qhead = 0
+        self.unsat = False
+        self.decisions = 0
+        self.conflicts = 0
+        self.propagations = 0
+        for clause in clauses:
+            self.add_clause(clause)
+
+    def value(self, lit):
+        value = self.values[abs(lit)]
+        return value if lit > 0 else -value
+
+    def add_clause(self, clause):
+        """Add an input clause at decision level 0"""
+        clause = list(dict.fromkeys(clause))
+        if any(-lit in clause for lit in clause):
+            return
+        if not clause:
+            self.unsat = True
+        elif len(clause) == 1:
+            if self.value(clause[0]) == -1:
+                self.unsat = True
+            elif not self.value(clause[0]):
+                self.enqueue(clause[0], None)
+        else:
+            self.attach(clause)
+
+    def attach(self, clause):
+        index = len(self.clauses)
+        self.clauses.append(clause)
+        self.watches[clause[0] + self.num_vars].append(index)
+        self.watches[clause[1] + self.num_vars].append(index)
+        return index
+
+    def enqueue(self, lit, reason):
+        var = abs(lit)
+        self.values[var] = 1 if lit > 0 else -1
+        self.level[var] = len(self.trail_lim)
+        self.reason[var] = reason
+        self.trail.append(lit)
+
+    def propagate(self):
+        """Unit propagation; returns the index of a conflicting clause or None"""
+        values, clauses, watches, offset = self.values, self.clauses, self.watches, self.num_vars
+        while self.qhead < len(self.trail):
+            false_lit = -self.trail[self.qhead]
+            self.qhead += 1
+            self.propagations += 1
+            watching = watches[false_lit + offset]
+            i = j = 0
+            count = len(watching)
+            while i < count:
+                index = watching[i]
+                i += 1
+                clause = clauses[index]
+                # Keep the falsified watch in position 1
+                if clause[0] == false_lit:
+                    clause[0], clause[1] = clause[1], false_lit
+                first = clause[0]
+                first_value = values[abs(first)] if first > 0 else -values[abs(first)]
+                if first_value == 1:
+                    watching[j] = index
+                    j += 1
+                    continue
+                for k in range(2, len(clause)):
+                    lit = clause[k]
+                    if (values[abs(lit)] if lit > 0 else -values[abs(lit)]) != -1:
+                        clause[1], clause[k] = lit, false_lit
+                        watches[lit + offset].append(index)
+                        break
+                else:
+                    watching[j] = index
+                    j += 1
+                    if first_value == -1:
+                        # Conflict: keep the remaining watchers and stop
+                        while i < count:
+                            watching[j] = watching[i]
+                            i += 1
+                            j += 1
+                        del watching[j:]
+                        self.qhead = len(self.trail)
+                        return index
+                    self.enqueue(first, index)
+            del watching[j:]
+        return None
+
+    def bump(self, var):
+        self.activity[var] += self.var_inc
+        if self.activity[var] > 1e100:
+            self.activity = [a * 1e-100 for a in self.activity]
+            self.var_inc *= 1e-100
+            self.heap = [(-self.activity[v], v) for v in range(1, self.num_vars + 1) if not self.values[v]]
+            heapq.heapify(self.heap)
+        elif not self.values[var]:
+            heapq.heappush(self.heap, (-self.activity[var], var))
+
+    def analyze(self, conflict):
+        """First-UIP learnt clause (asserting literal first) and its backjump level"""
+        learnt = [None]
+        seen = set()
+        current = len(self.trail_lim)
+        pending = 0
+        lit = None
+        position = len(self.trail) - 1
+        clause = self.clauses[conflict]
+        while True:
+            for q in (clause if lit is None else clause[1:]):
+                var = abs(q)
+                if var not in seen and self.level[var] > 0:
+                    seen.add(var)
+                    self.bump(var)
+                    if self.level[var] == current:
+                        pending += 1
+                    else:
+                        learnt.append(q)
+            while abs(self.trail[position]) not in seen:
+                position -= 1
+            lit = self.trail[position]
+            position -= 1
+            seen.discard(abs(lit))
+            pending -= 1
+            if not pending:
+                break
+            clause = self.clauses[self.reason[abs(lit)]]
+        learnt[0] = -lit
+
+        if len(learnt) == 1:
+            return learnt, 0
+        # The literal with the highest level becomes the second watch
+        best = max(range(1, len(learnt)), key=lambda k: self.level[abs(learnt[k])])
+        learnt[1], learnt[best] = learnt[best], learnt[1]
+        return learnt, self.level[abs(learnt[1])]
+
+    def backtrack(self, level):
+        if len(self.trail_lim) <= level:
+            return
+        start = self.trail_lim[level]
+        for lit in self.trail[start:]:
+            var = abs(lit)
+            self.phase[var] = lit > 0
+            self.values[var] = 0
+            self.reason[var] = None
+            heapq.heappush(self.heap, (-self.activity[var], var))
+        del self.trail[start:]
+        del self.trail_lim[level:]
+        self.qhead = len(self.trail)
+
+    def pick_branch_literal(self):
+        heap = self.heap
+        while heap:
+            key, var = heapq.heappop(heap)
+            if not self.values[var] and -key == self.activity[var]:
+                return var if self.phase[var] else -var
+        return None
+
+    def solve(self, should_stop=None):
+        """A model as a list of truth values indexed by variable, or None"""
+        if self.unsat:
+            return None
+        run = 1
+        budget = RESTART_UNIT * luby(run)
+        while True:
+            conflict = self.propagate()
+            if conflict is not None:
+                self.conflicts += 1
+                if not self.trail_lim:
+                    self.unsat = True
+                    return None
+                learnt, level = self.analyze(conflict)
+                self.backtrack(level)
+                if len(learnt) == 1:
+                    self.enqueue(learnt[0], None)
+                else:
+                    self.enqueue(learnt[0], self.attach(learnt))
+                self.var_inc /= VSIDS_DECAY
+                budget -= 1
+                if not budget:
+                    run += 1
+                    budget = RESTART_UNIT * luby(run)
+                    self.backtrack(0)
+                continue
+
+            if should_stop is not None and should_stop():
+                return None
+            lit = self.pick_branch_literal()
+            if lit is None:
+                return [value == 1 for value in self.values]
+            self.decisions += 1
+            self.trail_lim.append(len(self.trail))
+            self.enqueue(lit, None)
+
+
+def solve_grid(grid, should_stop=None):
+    """Solve a size x size grid through SAT; returns (solution or None, solver)"""
+    num_vars, clauses, decode = encode(grid)
+    solver = CDCLSolver(num_vars, clauses)
+    model = solver.solve(should_stop)
+    if model is None:
+        return None, solver
+    solution = [[int(v) for v in row] for row in grid]
+    for var in range(1, num_vars + 1):
+        if model[var]:
+            row, col, digit = decode[var]
+            solution[row][col] = digit
+    return solution, solver
+
+
+def sat_search(board, steps_counter=None, states=None, should_stop=None):
+    """Solve the board with the CDCL engine and write the model into it.
+
+    Steps are the solver's decisions plus its conflicts.
+    """
+    solution, solver = solve_grid(board.get_board_state(), should_stop)
+    if steps_counter is not None:
+        steps_counter[0] += solver.decisions + solver.conflicts
+    if solution is None:
+        return False
+    board.set_board_state(np.array(solution, dtype=int))
+    if states is not None:
+        states.append(board.get_board_state().copy())
+    return True
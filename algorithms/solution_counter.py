@@ -0,0 +1,180 @@
+from utils.grid_tables import ALL_DIGITS, CELL_COUNT, UNITS, PEERS
+
+
+def _eliminate(cand, queue):
+    """Remove every newly solved digit from its peers; False on a contradiction"""
+    while queue:
+        i = queue.pop()
+        bit = cand[i]
+        for p in PEERS[i]:
+            mask = cand[p]
+            if mask & bit:
+                mask &= ~bit
+                if not mask:
+                    return False
+                cand[p] = mask
+                if not mask & (mask - 1):
+                    queue.append(p)
+    return True
+
+
+def _propagate(cand, queue):
+    """Naked and hidden singles to a fixpoint; False on a contradiction"""
+    while True:
+        if not _eliminate(cand, queue):
+            return False
+        for unit in UNITS:
+            once = twice = solved = 0
+            for i in unit:
+                mask = cand[i]
+                twice |= once & mask
+                once |= mask
+                if not mask & (mask - 1):
+                    solved |= mask
+            if once != ALL_DIGITS:
+                return False
+            hidden = once & ~twice & ~solved
+            while hidden:
+                bit = hidden & -hidden
+                hidden ^= bit
+                for i in unit:
+                    if cand[i] & bit:
+                        cand[i] = bit
+                        queue.append(i)
+                        break
+        if not queue:
+            return True
+
+
+def _initial_candidates(grid):
+    """Candidate masks for a 9x9 grid plus the cells left with a single candidate.
+
+    Returns (None, None) if the givens already clash.
+    """
+    rows = [0] * 9
+    cols = [0] * 9
+    boxes = [0] * 9
+    values = [int(v) for line in grid for v in line]
+    for i, d in enumerate(values):
+        if d:
+            bit = 1 << d
+            r, c = divmod(i, 9)
+            b = (r // 3) * 3 + c // 3
+            if (rows[r] | cols[c] | boxes[b]) & bit:
+                return None, None
+            rows[r] |= bit
+            cols[c] |= bit
+            boxes[b] |= bit
+
+    cand = [0] * CELL_COUNT
+    queue = []
+    for i, d in enumerate(values):
+        if d:
+            cand[i] = 1 << d
+            continue
+        r, c = divmod(i, 9)
+        mask = ~(rows[r] | cols[c] | boxes[(r // 3) * 3 + c // 3]) & ALL_DIGITS
+        if not mask:
+            return None, None
+        cand[i] = mask
+        if not mask & (mask - 1):
+            queue.append(i)
+    return cand, queue
+
+
+def _search(cand, limit, solutions):
+    # Most constrained unsolved cell
+    best = -1
+    best_count = 10
+    for i in range(CELL_COUNT):
+        count = cand[i].bit_count()
+        if 1 < count < best_count:
+            best = i
+            best_count = count
+            if count == 2:
+                break
+    if best < 0:
+        solutions.append(cand)
+        return len(solutions) >= limit
+
+    mask = cand[best]
+    while mask:
+        bit = mask & -mask
+        mask ^= bit
+        child = cand[:]
+        child[best] = bit
+        if _propagate(child, [best]) and _search(child, limit, solutions):
+            return True
+    return False
+
+
+def _to_grid(cand):
+    return [[cand[r * 9 + c].bit_length() - 1 for c in range(9)] for r in range(9)]
+
+
+def find_solutions(grid, limit=2):
+    """Return up to `limit` solutions of a 9x9 grid as lists of rows"""
+    cand, queue = _initial_candidates(grid)
+    if cand is None or not _propagate(cand, queue):
+        return []
+    solutions = []
+    _search(cand, limit, solutions)
+    return [_to_grid(solution) for solution in solutions]
+
+
+def count_solutions(grid, limit=2):
+    """Count the solutions of a 9x9 grid, stopping as soon as `limit` is reached.
+
+    count_solutions(grid) == 1 means the puzzle has a unique solution.
+    """
+    cand, queue = _initial_candidates(grid)
+    if cand is None or not _propagate(cand, queue):
+        return 0
+    solutions = []
+    _search(cand, limit, solutions)
+    return len(solutions)
+
+
+def has_solution_without(grid, row, col, num):
+    """True if the grid has a solution in which (row, col) does not hold num.
+
+    When a grid is known to have the solution with num at (row, col), this is
+    exactly the question "is the puzzle ambiguous?", and it is usually much
+    cheaper than counting to two because the excluded digit propagates.
+    """
+    cand, queue = _initial_candidates(grid)
+    if cand is None:
+        return False
+    i = row * 9 + col
+    mask = cand[i] & ~(1 << int(num))
+    if not mask:
+        return False
+    cand[i] = mask
+    if not mask & (mask - 1):
+        queue.append(i)
+    if not _propagate(cand, queue):
+        return False
+    return _search(cand, 1, [])
+
+
+def solution_without(grid, row, col, num):
+    """A solution of the grid in which (row, col) does not hold num, or None.
+
+    Same search as has_solution_without, but the solution found is returned
+    (as a list of rows) so callers can keep it as a witness.
+    """
+    cand, queue = _initial_candidates(grid)
+    if cand is None:
+        return None
+    i = row * 9 + col
+    mask = cand[i] & ~(1 << int(num))
+    if not mask:
+        return None
+    cand[i] = mask
+    if not mask & (mask - 1):
+        queue.append(i)
+    if not _propagate(cand, queue):
+        return None
+    solutions = []
+    _search(cand, 1, solutions)
+    return _to_grid(solutions[0]) if solutions else None
@@ -19,7 +19,7 @@ class GUI:
         self.error_font = pygame.font.Font(None, ERROR_FONT_SIZE)
         
         self.selected_cell = None
-        self.selected_algorithm = None
+        self.selected_algorithm = DEFAULT_ALGORITHM
         self.metrics = None
         self.scroll_y = 0
         self.max_scroll = 0
@@ -794,7 +794,10 @@ class GUI:
                 self.metrics = self.solve_result
                 self.solve_cancelled = False
                 if self.metrics is None:
-                    self.show_export_popup("No solution found (timeout or unsolvable).", ok_only=True)
+                    if algorithm_manager.truncated:
+                        self.show_export_popup("Search stopped at the memory limit.", ok_only=True)
+                    else:
+                        self.show_export_popup("No solution found (timeout or unsolvable).", ok_only=True)
                     if self.solve_cancelled and self.board_state_before_solve is not None:
                         board.set_board_state(self.board_state_before_solve)
                     self.error_message = None
@@ -0,0 +1,133 @@
+import argparse
+import json
+import os
+import random
+import numpy as np
+from utils.constants import BOARD_SIZE, DIFFICULTY_LEVELS, PUZZLE_BANK_PATH
+from utils.canonical import unique_grids
+
+# One puzzle per record: 81 cells, one uint8 each, row-major
+RECORD_SIZE = BOARD_SIZE * BOARD_SIZE
+
+
+def _data_path(path):
+    return path + ".bin"
+
+
+def _index_path(path):
+    return path + ".json"
+
+
+class PuzzleBank:
+    """Pre-generated puzzles stored as fixed-size records and read with numpy.memmap.
+
+    Records of one difficulty are contiguous and sorted by clue count; the
+    JSON index maps each difficulty (and each clue count inside it) to a
+    range of records, so drawing a puzzle is a single O(1) slice.
+    """
+
+    def __init__(self, path):
+        with open(_index_path(path)) as f:
+            self.index = json.load(f)
+        total = self.index["total"]
+        self.records = None
+        if total:
+            self.records = np.memmap(_data_path(path), dtype=np.uint8, mode="r",
+                                     shape=(total, RECORD_SIZE))
+
+    def difficulties(self):
+        return list(self.index["difficulties"].keys())
+
+    def count(self, difficulty, clues=None):
+        entry = self.index["difficulties"].get(difficulty)
+        if entry is None:
+            return 0
+        if clues is None:
+            return entry["count"]
+        return entry["clues"].get(str(clues), [0, 0])[1]
+
+    def get(self, difficulty, position, clues=None):
+        """The puzzle at a fixed position within a difficulty (reproducible access)"""
+        entry = self.index["difficulties"][difficulty]
+        start, count = entry["offset"], entry["count"]
+        if clues is not None:
+            start, count = entry["clues"][str(clues)]
+        if not 0 <= position < count:
+            raise IndexError(f"puzzle {position} out of range for {difficulty}")
+        record = self.records[start + position]
+        return np.array(record, dtype=int).reshape(BOARD_SIZE, BOARD_SIZE)
+
+    def draw(self, difficulty, rng=random, clues=None):
+        """A random puzzle of the given difficulty, or None if the bank has none"""
+        count = self.count(difficulty, clues)
+        if not count:
+            return None
+        return self.get(difficulty, rng.randrange(count), clues)
+
+
+def load_puzzle_bank(path=PUZZLE_BANK_PATH):
+    """Open a puzzle bank, or return None if it has not been built"""
+    if not os.path.exists(_index_path(path)):
+        return None
+    return PuzzleBank(path)
+
+
+def write_puzzle_bank(path, puzzles_by_difficulty):
+    """Write {difficulty: [9x9 puzzles]} as a bank at `path`"""
+    difficulties = {}
+    blocks = []
+    offset = 0
+    for difficulty, puzzles in puzzles_by_difficulty.items():
+        records = np.array([np.asarray(p).ravel() for p in puzzles], dtype=np.uint8).reshape(-1, RECORD_SIZE)
+        clue_counts = np.count_nonzero(records, axis=1)
+        order = np.argsort(clue_counts, kind="stable")
+        records = records[order]
+        clue_counts = clue_counts[order]
+
+        clues = {}
+        for clue in np.unique(clue_counts):
+            first = int(np.searchsorted(clue_counts, clue, side="left"))
+            last = int(np.searchsorted(clue_counts, clue, side="right"))
+            clues[str(int(clue))] = [offset + first, last - first]
+        difficulties[difficulty] = {"offset": offset, "count": len(records), "clues": clues}
+        blocks.append(records)
+        offset += len(records)
+
+    with open(_data_path(path), "wb") as f:
+        for records in blocks:
+            f.write(records.tobytes())
+    with open(_index_path(path), "w") as f:
+        json.dump({"record_size": RECORD_SIZE, "total": offset, "difficulties": difficulties}, f, indent=2)
+
+
+def build_puzzle_bank(path=PUZZLE_BANK_PATH, count=1000, difficulties=None, workers=None, seed=None):
+    """Generate `count` puzzles per difficulty in parallel and store them as a bank.
+
+    Puzzles equivalent under the Sudoku symmetries are stored once.
+    """
+    # Imported here: puzzle_batch depends on SudokuBoard, which loads banks
+    from game.puzzle_batch import generate_puzzles
+
+    if difficulties is None:
+        difficulties = list(DIFFICULTY_LEVELS.keys())
+    rng = random.Random(seed)
+    puzzles = {
+        difficulty: list(unique_grids(generate_puzzles(count, difficulty, workers=workers,
+                                                        seed=rng.getrandbits(64))))
+        for difficulty in difficulties
+    }
+    write_puzzle_bank(path, puzzles)
+    return PuzzleBank(path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an on-disk Sudoku puzzle bank")
+    parser.add_argument("path", nargs="?", default=PUZZLE_BANK_PATH)
+    parser.add_argument("--count", type=int, default=1000, help="puzzles per difficulty")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    bank = build_puzzle_bank(args.path, args.count, workers=args.workers, seed=args.seed)
+    for difficulty in bank.difficulties():
+        print(f"{difficulty}: {bank.count(difficulty)} puzzles")
@@ -0,0 +1,62 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from game.sudoku_board import SudokuBoard
+
+# Puzzles generated per task; small enough to stream, large enough to
+# amortise the inter-process round trip
+BATCH_CHUNK_SIZE = 32
+
+
+def _generate_chunk(difficulty, count, seed, rating=None):
+    """Worker: generate `count` puzzles with a private RNG seeded with `seed`"""
+    rng = random.Random(seed)
+    board = SudokuBoard(generate=False)
+    # Always generate live, never draw from an existing bank
+    board.puzzle_bank = None
+    puzzles = []
+    for _ in range(count):
+        board.new_game(difficulty, rating, rng)
+        puzzles.append(board.get_board_state())
+    return puzzles
+
+
+def generate_puzzles(n, difficulty, workers=None, seed=None, chunk_size=BATCH_CHUNK_SIZE, rating=None):
+    """Generate `n` puzzles of a difficulty (and optionally a rating) across a process pool.
+
+    Work is split into chunks, each with its own seed derived from `seed`,
+    so a given seed produces the same set of puzzles whatever the number of
+    workers; only the arrival order depends on scheduling. (Puzzles whose
+    clue target is cut short by GENERATION_TIME_LIMIT depend on timing.)
+    Puzzles are yielded as 9x9 arrays as soon as their chunk finishes;
+    closing the generator cancels the chunks still running or queued.
+    workers=1 runs in-process.
+    """
+    rng = random.Random(seed)
+    chunks = []
+    remaining = n
+    while remaining > 0:
+        count = min(chunk_size, remaining)
+        chunks.append((difficulty, count, rng.getrandbits(64), rating))
+        remaining -= count
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _generate_chunk(*chunk)
+        return
+
+    executor = ProcessPoolExecutor(max_workers=workers)
+    futures = [executor.submit(_generate_chunk, *chunk) for chunk in chunks]
+    try:
+        for future in as_completed(futures):
+            yield from future.result()
+    finally:
+        # Closing the generator early drops the chunks not started yet and
+        # stops the ones in progress instead of waiting for the whole batch
+        workers_left = list(executor._processes.values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        if not all(future.done() for future in futures):
+            for process in workers_left:
+                process.terminate()
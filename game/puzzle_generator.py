@@ -0,0 +1,185 @@
+import random
+import time
+import numpy as np
+from utils.constants import BOARD_SIZE, GENERATION_TIME_LIMIT, RATINGS, RATING_TIME_LIMIT
+from algorithms.solution_counter import solution_without
+from algorithms.difficulty_rater import rate_puzzle
+
+# Moves without a new low in clue count before the generator kicks the
+# puzzle off its plateau by putting KICK_SIZE random clues back
+REPAIR_PATIENCE = 20
+KICK_SIZE = 3
+
+# Canonical solved grid: row r is the digit sequence shifted by 3*(r%3) + r//3
+_BASE_GRID = np.array([[(3 * (r % 3) + r // 3 + c) % 9 for c in range(BOARD_SIZE)]
+                       for r in range(BOARD_SIZE)])
+
+
+def _shuffled(rng, items):
+    items = list(items)
+    rng.shuffle(items)
+    return items
+
+
+def generate_solved_grid(rng=random):
+    """Random solved grid obtained by transforming a canonical one.
+
+    Relabelling digits, permuting bands/stacks, permuting rows/columns
+    inside them and transposing all preserve validity, so no search is needed.
+    """
+    rows = [band * 3 + r for band in _shuffled(rng, range(3)) for r in _shuffled(rng, range(3))]
+    cols = [stack * 3 + c for stack in _shuffled(rng, range(3)) for c in _shuffled(rng, range(3))]
+    digits = np.array(_shuffled(rng, range(1, 10)))
+    grid = digits[_BASE_GRID[np.ix_(rows, cols)]]
+    if rng.random() < 0.5:
+        grid = grid.T
+    return np.ascontiguousarray(grid)
+
+
+def dig_puzzle(puzzle, target_clues, rng=random, keep=(), witnesses=None):
+    """Remove clues in place, one at a time, while the puzzle stays unique.
+
+    Clues are visited in random order and a removal is kept only if no other
+    solution appears. Stops when `target_clues` clues are left or every
+    remaining clue is needed. Cells listed in `keep` are never removed.
+    A clue that has to stay comes with a witness: a solution of the puzzle
+    without it, which stays one as more clues go. With a `witnesses` dict
+    they are stored under their (row, col).
+    Returns the number of clues removed.
+    """
+    clues = int(np.count_nonzero(puzzle))
+    positions = [(i, j) for i in range(BOARD_SIZE) for j in range(BOARD_SIZE)
+                 if puzzle[i][j] and (i, j) not in keep]
+    rng.shuffle(positions)
+
+    removed = 0
+    for row, col in positions:
+        if clues - removed <= target_clues:
+            break
+        value = puzzle[row][col]
+        puzzle[row][col] = 0
+        # The puzzle stays unique iff no solution uses another digit here
+        witness = solution_without(puzzle, row, col, value)
+        if witness is not None:
+            puzzle[row][col] = value
+            if witnesses is not None:
+                witnesses[row, col] = np.array(witness)
+        else:
+            removed += 1
+    return removed
+
+
+def generate_unique_puzzle(solution, target_clues, rng=random, time_limit=GENERATION_TIME_LIMIT):
+    """Build a puzzle with a unique solution and (ideally) `target_clues` clues.
+
+    Random digging usually gets stuck at a minimal puzzle of 22-26 clues.
+    While time remains, the generator then puts one missing clue back and
+    tries to dig around it: a move that removes at least one other clue is
+    kept, so the search drifts towards sparser puzzles.
+
+    Every clue of the puzzle keeps a witness, an alternative solution of
+    the puzzle without it. Putting back cell X can only make clue Y
+    removable if Y's witness disagrees with the solution at X, so X is
+    drawn among the cells that break the most witnesses and only those
+    clues are tried; every other witness stays valid. After REPAIR_PATIENCE
+    moves without a new low, or when no cell can free a clue, KICK_SIZE
+    random clues are put back to leave the plateau. The result is always
+    unique (the sparsest puzzle met), but very low targets may not be
+    reached within `time_limit`.
+    """
+    solution = np.array(solution, dtype=int)
+    deadline = time.time() + time_limit
+
+    puzzle = solution.copy()
+    witnesses = {}
+    clues = int(np.count_nonzero(puzzle)) - dig_puzzle(puzzle, target_clues, rng, witnesses=witnesses)
+    best = puzzle.copy()
+    tried = np.zeros(puzzle.shape, dtype=bool)   # cells put back without effect since the last move
+    stale = 0   # moves since the sparsest puzzle was found
+    while clues > target_clues and time.time() < deadline:
+        # Clues that lost their witness are checked again, and dropped if no longer needed
+        for row, col in _shuffled(rng, zip(*np.nonzero(puzzle))):
+            if (row, col) not in witnesses:
+                value = puzzle[row][col]
+                puzzle[row][col] = 0
+                witness = solution_without(puzzle, row, col, value)
+                if witness is None:
+                    clues -= 1
+                else:
+                    puzzle[row][col] = value
+                    witnesses[row, col] = np.array(witness)
+        if clues < np.count_nonzero(best):
+            best = puzzle.copy()
+            stale = 0
+        if clues <= target_clues:
+            break
+
+        cells = list(witnesses)
+        broken = np.array([witnesses[cell] != solution for cell in cells])
+        counts = broken.sum(axis=0)
+        counts[(puzzle != 0) | tried] = 0
+        if stale >= REPAIR_PATIENCE or not counts.any():
+            # Kick: put a few clues back, keeping the witnesses they do not break
+            kick = _shuffled(rng, zip(*np.nonzero(puzzle == 0)))[:KICK_SIZE]
+            for cell in kick:
+                puzzle[cell] = solution[cell]
+            witnesses = {cell: witness for cell, witness in witnesses.items()
+                         if all(witness[k] == solution[k] for k in kick)}
+            clues += len(kick)
+            tried[:] = False
+            stale = 0
+            continue
+
+        weights = counts.ravel() ** 2
+        index = rng.choices(range(puzzle.size), weights=weights.tolist())[0]
+        row, col = divmod(index, BOARD_SIZE)
+
+        candidate = puzzle.copy()
+        candidate[row][col] = solution[row][col]
+        suspects = [cells[k] for k in np.flatnonzero(broken[:, row, col])]
+        rng.shuffle(suspects)
+        removed = []
+        for cell in suspects:
+            if clues + 1 - len(removed) <= target_clues:
+                break
+            value = candidate[cell]
+            candidate[cell] = 0
+            witness = solution_without(candidate, cell[0], cell[1], value)
+            if witness is None:
+                removed.append(cell)
+            else:
+                # A solution without this clue here is one without it in puzzle too
+                candidate[cell] = value
+                witnesses[cell] = np.array(witness)
+        stale += 1
+        if removed:
+            puzzle = candidate
+            clues += 1 - len(removed)
+            for cell in removed:
+                del witnesses[cell]
+            tried[:] = False
+        else:
+            tried[row][col] = True
+    return best if clues > np.count_nonzero(best) else puzzle
+
+
+def generate_rated_puzzle(rating, target_clues, rng=random, time_limit=RATING_TIME_LIMIT):
+    """Generate unique puzzles until one has the requested technique rating.
+
+    Returns (puzzle, report) where report comes from rate_puzzle. If no
+    puzzle matches within `time_limit`, the one with the closest rating is
+    returned instead.
+    """
+    wanted = RATINGS.index(rating)
+    deadline = time.time() + time_limit
+    best = None
+    best_distance = len(RATINGS)
+    while True:
+        budget = min(GENERATION_TIME_LIMIT, max(deadline - time.time(), 0))
+        puzzle = generate_unique_puzzle(generate_solved_grid(rng), target_clues, rng, budget)
+        report = rate_puzzle(puzzle)
+        distance = abs(RATINGS.index(report["rating"]) - wanted)
+        if distance < best_distance:
+            best, best_distance = (puzzle, report), distance
+        if best_distance == 0 or time.time() >= deadline:
+            return best
@@ -1,74 +1,65 @@
 import numpy as np
 import random
 from utils.constants import BOARD_SIZE, DIFFICULTY_LEVELS
+from utils.canonical import canonical_key
+from utils.state_key import ZOBRIST_KEYS, zobrist_hash, pack_state
+from algorithms.solution_counter import count_solutions
+from game.puzzle_generator import generate_solved_grid, generate_unique_puzzle, generate_rated_puzzle
+from algorithms.difficulty_rater import rate_puzzle
+from game.puzzle_bank import load_puzzle_bank
+from utils.grid_tables import ALL_DIGITS
 
 class SudokuBoard:
-    def __init__(self):
+    def __init__(self, generate=True):
         self.board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
         self.original_board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
         self.initial_board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
         self.difficulty = "Easy"
-        self.generate_puzzle()
+        # "Used digits" bitmasks per row, column and 3x3 box (bit n = digit n)
+        self.row_masks = [0] * BOARD_SIZE
+        self.col_masks = [0] * BOARD_SIZE
+        self.box_masks = [0] * BOARD_SIZE
+        self.has_conflicts = False
+        # Bitset of empty cells, bit (row * 9 + col) set while the cell holds 0
+        self.empty_cells = 0
+        # Zobrist hash of the board, updated on every placement
+        self.state_key = 0
+        # Pre-generated puzzles to draw new games from (None: generate live)
+        self.puzzle_bank = load_puzzle_bank()
+        if generate:
+            self.new_game(self.difficulty)
+        else:
+            self._rebuild_masks()
 
-    def generate_puzzle(self):
+    def generate_puzzle(self, rng=random):
         # Generate a solved board
-        self.generate_solved_board()
+        self.generate_solved_board(rng)
         
         # Create a puzzle by removing numbers
-        self.create_puzzle_from_solution()
+        self.create_puzzle_from_solution(rng=rng)
         
         # Save the initial state
         self.initial_board = self.board.copy()
         self.original_board = self.board.copy()
 
-    def generate_solved_board(self):
+    def generate_solved_board(self, rng=random):
         """Generate a completely solved Sudoku board"""
-        # Start with an empty board
-        self.board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
-        
-        # Use backtracking to fill the board
-        self._solve_board()
-        
-    def _solve_board(self):
-        """Use backtracking to solve the board"""
-        empty = self.find_empty()
-        if not empty:
-            return True
-            
-        row, col = empty
-        # Shuffle numbers for randomness
-        numbers = list(range(1, 10))
-        random.shuffle(numbers)
-        
-        for num in numbers:
-            if self.is_valid_move(row, col, num):
-                self.board[row][col] = num
-                
-                if self._solve_board():
-                    return True
-                    
-                self.board[row][col] = 0
-                
-        return False
-
-    def create_puzzle_from_solution(self):
-        """Create a puzzle by removing numbers from a solved board"""
+        # Shuffle a canonical solved grid with validity-preserving transforms
+        self.board = generate_solved_grid(rng)
+        self._rebuild_masks()
+
+    def create_puzzle_from_solution(self, cells_to_keep=None, rng=random):
+        """Create a puzzle with a unique solution by removing numbers from a solved board"""
         # Start with a solved board
         solution = self.board.copy()
         
         # Determine how many cells to keep based on difficulty
-        cells_to_keep = DIFFICULTY_LEVELS.get(self.difficulty, 25)
+        if cells_to_keep is None:
+            cells_to_keep = DIFFICULTY_LEVELS.get(self.difficulty, 25)
         
-        # Create a list of all positions
-        positions = [(i, j) for i in range(BOARD_SIZE) for j in range(BOARD_SIZE)]
-        random.shuffle(positions)
-        
-        # Keep only a subset of cells
-        self.board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
-        for i in range(cells_to_keep):
-            if i < len(positions):
-                row, col = positions[i]
-                self.board[row][col] = solution[row][col]
+        # Remove clues one at a time as long as the solution stays unique
+        self.board = generate_unique_puzzle(solution, cells_to_keep, rng)
+        self._rebuild_masks()
         
         # Save the original board
         self.original_board = self.board.copy()
@@ -76,69 +67,155 @@ class SudokuBoard:
     def reset_to_initial(self):
         """Reset the board to its initial state"""
         self.board = self.initial_board.copy()
+        self._rebuild_masks()
 
-    def new_game(self, difficulty=None):
-        """Start a new game with a different puzzle"""
-        if difficulty == "Random":
+    def new_game(self, difficulty=None, rating=None, rng=random):
+        """Start a new game with a different puzzle
+        
+        With a rating (see RATINGS) the puzzle is generated until the hardest
+        technique it needs matches; the difficulty then only sets the clue count.
+        All randomness comes from `rng` (a random.Random or the random module).
+        """
+        if rating is not None:
+            if difficulty in DIFFICULTY_LEVELS:
+                self.difficulty = difficulty
+            cells_to_keep = DIFFICULTY_LEVELS.get(self.difficulty, 25)
+            puzzle, _ = generate_rated_puzzle(rating, cells_to_keep, rng)
+            self.load_puzzle(puzzle)
+        elif difficulty == "Random":
             # Generate a random number of cells to keep (between 20 and 35)
-            cells_to_keep = random.randint(20, 35)
-            
-            # Generate a solved board
-            self.generate_solved_board()
-            solution = self.board.copy()
+            cells_to_keep = rng.randint(20, 35)
             
-            # Create a list of all positions
-            positions = [(i, j) for i in range(BOARD_SIZE) for j in range(BOARD_SIZE)]
-            random.shuffle(positions)
-            
-            # Keep only a random subset of cells
-            self.board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
-            for i in range(cells_to_keep):
-                if i < len(positions):
-                    row, col = positions[i]
-                    self.board[row][col] = solution[row][col]
+            # Generate a solved board and dig a unique puzzle from it
+            self.generate_solved_board(rng)
+            self.create_puzzle_from_solution(cells_to_keep, rng)
             
             # Save the initial state
             self.initial_board = self.board.copy()
             self.original_board = self.board.copy()
         elif difficulty:
             self.difficulty = difficulty
-            self.generate_puzzle()
+            puzzle = None
+            if self.puzzle_bank is not None:
+                puzzle = self.puzzle_bank.draw(difficulty, rng)
+            if puzzle is not None:
+                self.load_puzzle(puzzle)
+            else:
+                self.generate_puzzle(rng)
         else:
             # Clear the board for manual input
             self.board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
             self.original_board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
             self.initial_board = np.zeros((BOARD_SIZE, BOARD_SIZE), dtype=int)
+            self._rebuild_masks()
+
+    def load_puzzle(self, puzzle):
+        """Start a game from a given puzzle grid"""
+        self.board = np.array(puzzle, dtype=int).reshape(BOARD_SIZE, BOARD_SIZE)
+        self._rebuild_masks()
+        self.initial_board = self.board.copy()
+        self.original_board = self.board.copy()
+
+    def _rebuild_masks(self):
+        """Recompute the row/column/box digit masks from the whole board"""
+        bits = np.left_shift(1, self.board) & ALL_DIGITS
+        boxes = bits.reshape(3, 3, 3, 3).swapaxes(1, 2).reshape(BOARD_SIZE, BOARD_SIZE)
+        self.row_masks = np.bitwise_or.reduce(bits, axis=1).tolist()
+        self.col_masks = np.bitwise_or.reduce(bits, axis=0).tolist()
+        self.box_masks = np.bitwise_or.reduce(boxes, axis=1).tolist()
+        
+        empty = self.board.ravel() == 0
+        self.empty_cells = int.from_bytes(np.packbits(empty, bitorder='little').tobytes(), 'little')
+        self.state_key = zobrist_hash(self.board)
+
+        # A unit holding the same digit twice has fewer mask bits than filled cells
+        filled = BOARD_SIZE * BOARD_SIZE - int(np.count_nonzero(empty))
+        self.has_conflicts = any(
+            sum(mask.bit_count() for mask in masks) != filled
+            for masks in (self.row_masks, self.col_masks, self.box_masks)
+        )
+
+    def _place(self, row, col, num):
+        """Write a digit into an empty cell and mark it as used"""
+        bit = 1 << num
+        self.board[row][col] = num
+        self.state_key ^= ZOBRIST_KEYS[row * BOARD_SIZE + col][num]
+        self.row_masks[row] |= bit
+        self.col_masks[col] |= bit
+        self.box_masks[(row // 3) * 3 + col // 3] |= bit
+        self.empty_cells &= ~(1 << (row * BOARD_SIZE + col))
+
+    def _clear(self, row, col):
+        """Empty a cell and release its digit"""
+        num = int(self.board[row][col])
+        if num == 0:
+            return
+        self.board[row][col] = 0
+        self.empty_cells |= 1 << (row * BOARD_SIZE + col)
+        self.state_key ^= ZOBRIST_KEYS[row * BOARD_SIZE + col][num]
+        if self.has_conflicts:
+            # The digit may still be used elsewhere in the unit
+            self._rebuild_masks()
+            return
+        bit = ~(1 << num)
+        self.row_masks[row] &= bit
+        self.col_masks[col] &= bit
+        self.box_masks[(row // 3) * 3 + col // 3] &= bit
+
+    def get_candidate_mask(self, row, col):
+        """Bitmask of the digits not yet used in the cell's row, column and box"""
+        used = self.row_masks[row] | self.col_masks[col] | self.box_masks[(row // 3) * 3 + col // 3]
+        return ~used & ALL_DIGITS
+
+    def get_candidates(self, row, col):
+        """List of the digits that can be placed in a cell"""
+        mask = self.get_candidate_mask(row, col)
+        return [num for num in range(1, 10) if mask >> num & 1]
 
     def is_valid_move(self, row, col, num):
-        # Check row
-        if num in self.board[row]:
+        num = int(num)
+        if not 1 <= num <= 9:
             return False
+        used = self.row_masks[row] | self.col_masks[col] | self.box_masks[(row // 3) * 3 + col // 3]
+        return not used >> num & 1
 
-        # Check column
-        if num in self.board[:, col]:
-            return False
+    def find_empty(self):
+        """First empty cell in row-major order, or None if the board is full"""
+        empty = self.empty_cells
+        if not empty:
+            return None
+        return divmod((empty & -empty).bit_length() - 1, BOARD_SIZE)
 
-        # Check 3x3 box
-        box_row = (row // 3) * 3
-        box_col = (col // 3) * 3
-        box = self.board[box_row:box_row + 3, box_col:box_col + 3]
-        if num in box:
-            return False
+    def count_empty(self):
+        return self.empty_cells.bit_count()
 
-        return True
+    def get_empty_cells(self):
+        """Yield the empty cells in row-major order"""
+        empty = self.empty_cells
+        while empty:
+            lowest = empty & -empty
+            yield divmod(lowest.bit_length() - 1, BOARD_SIZE)
+            empty ^= lowest
 
-    def find_empty(self):
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                if self.board[i][j] == 0:
-                    return (i, j)
-        return None
+    def find_most_constrained_empty(self):
+        """Empty cell with the fewest candidates (first one in row-major order on ties)"""
+        best = None
+        best_count = 10
+        for row, col in self.get_empty_cells():
+            count = self.get_candidate_mask(row, col).bit_count()
+            if count < best_count:
+                best = (row, col)
+                best_count = count
+                if count <= 1:
+                    break
+        return best
 
     def set_value(self, row, col, value):
         if self.original_board[row][col] == 0:
             if value == 0 or self.is_valid_move(row, col, value):
-                self.board[row][col] = value
+                self._clear(row, col)
+                if value != 0:
+                    self._place(row, col, int(value))
 
     def get_value(self, row, col):
         return self.board[row][col]
@@ -147,48 +224,48 @@ class SudokuBoard:
         return self.original_board[row][col] != 0
 
     def is_complete(self):
-        return 0 not in self.board
+        return self.empty_cells == 0
 
     def get_board_state(self):
         return self.board.copy()
 
+    def get_canonical_state(self):
+        """Key shared by every board equivalent under the Sudoku symmetries.
+
+        Milliseconds per call (see canonical_key); per-node lookups during a
+        search should use get_state_key() or get_packed_state() instead.
+        """
+        return canonical_key(self.board)
+
+    def get_state_key(self):
+        """64-bit Zobrist hash of the current board"""
+        return self.state_key
+
+    def get_packed_state(self):
+        """Exact 41-byte encoding of the current board"""
+        return pack_state(self.board)
+
     def set_board_state(self, state):
         self.board = state.copy()
+        self._rebuild_masks()
 
     def is_valid_board(self):
         """Check if the current board state is valid and can be solved"""
         # Check if current state is valid
-        for i in range(BOARD_SIZE):
-            for j in range(BOARD_SIZE):
-                if self.board[i][j] != 0:
-                    # Temporarily remove the number to check if it's valid
-                    num = self.board[i][j]
-                    self.board[i][j] = 0
-                    if not self.is_valid_move(i, j, num):
-                        self.board[i][j] = num
-                        return False
-                    self.board[i][j] = num
-        
-        # Try to solve a copy of the board
-        board_copy = self.board.copy()
-        result = self._check_solvable()
-        self.board = board_copy
-        return result
+        if self.has_conflicts:
+            return False
         
-    def _check_solvable(self):
-        """Check if the current board state can be solved"""
-        empty = self.find_empty()
-        if not empty:
-            return True
-            
-        row, col = empty
-        for num in range(1, 10):
-            if self.is_valid_move(row, col, num):
-                self.board[row][col] = num
-                
-                if self._check_solvable():
-                    return True
-                    
-                self.board[row][col] = 0
-                
-        return False 
\ No newline at end of file
+        return self.count_solutions(limit=1) > 0
+
+    def count_solutions(self, limit=2):
+        """Number of solutions of the current board, counted up to `limit`"""
+        if self.has_conflicts:
+            return 0
+        return count_solutions(self.board, limit)
+
+    def get_rating(self):
+        """Technique-based rating of the current board (see rate_puzzle)"""
+        return rate_puzzle(self.board)
+
+    def has_unique_solution(self):
+        return self.count_solutions(limit=2) == 1 
\ No newline at end of file
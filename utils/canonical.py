@@ -0,0 +1,190 @@
+from itertools import permutations, product
+import numpy as np
+from utils.constants import BOARD_SIZE
+from utils.state_key import pack_state, unpack_state
+
+# All 1296 column orders that keep the stack structure:
+# 6 stack orders x 6 column orders inside each of the 3 stacks
+_TRIPLE_PERMS = list(permutations(range(3)))
+COLUMN_ORDERS = np.array([
+    [stack * 3 + inner[s][c] for s, stack in enumerate(stacks) for c in range(3)]
+    for stacks in _TRIPLE_PERMS
+    for inner in product(_TRIPLE_PERMS, repeat=3)
+])
+
+_ROW_BAND = np.arange(BOARD_SIZE) // 3
+_PLACE_BITS = 1 << np.arange(BOARD_SIZE - 1, -1, -1, dtype=np.int64)
+_PLACE_VALUES = 10 ** np.arange(BOARD_SIZE - 1, -1, -1, dtype=np.int64)
+
+
+def canonical_form(grid):
+    """Representative of a grid's class under the Sudoku symmetries.
+
+    The class is generated by transposition, band/stack permutations,
+    row/column permutations inside bands/stacks and digit relabelling.
+    The representative is the lexicographically smallest grid (empty cells
+    sort first) once digits are relabelled 1, 2, ... in order of first
+    appearance. It is built row by row: every column order x transposition
+    is carried as a candidate, each one is extended by every row allowed by
+    the band structure, and only candidates producing the smallest row
+    prefix survive. All candidates are processed together with NumPy.
+    """
+    grid = np.asarray(grid, dtype=np.int64).reshape(BOARD_SIZE, BOARD_SIZE)
+    grids = np.stack([grid, grid.T])
+
+    count = 2 * len(COLUMN_ORDERS)
+    transposed = np.repeat(np.arange(2), len(COLUMN_ORDERS))
+    orders = np.tile(np.arange(len(COLUMN_ORDERS)), 2)
+    used_rows = np.zeros(count, dtype=np.int64)
+    current_band = np.zeros(count, dtype=np.int64)
+    mapping = np.zeros((count, 10), dtype=np.int64)
+    next_label = np.ones(count, dtype=np.int64)
+    rows = []
+    clues = int(np.count_nonzero(grid))
+    placed = 0
+
+    for position in range(BOARD_SIZE):
+        if placed == clues:
+            # Every clue is placed: the remaining rows are empty
+            break
+        # Rows each candidate may place at this position
+        row = np.repeat(np.arange(BOARD_SIZE), len(orders))
+        parent = np.tile(np.arange(len(orders)), BOARD_SIZE)
+        if position:
+            free = (used_rows[parent] >> row) & 1 == 0
+            if position % 3:
+                free &= _ROW_BAND[row] == current_band[parent]
+            else:
+                band_used = (used_rows[parent] >> (_ROW_BAND[row] * 3)) & 0b111
+                free &= band_used == 0
+            row, parent = row[free], parent[free]
+
+        values = grids[transposed[parent][:, None], row[:, None], COLUMN_ORDERS[orders[parent]]]
+        if position == 0:
+            # The digits of a row are distinct, so the first row is labelled
+            # 1, 2, ... in order and only its empty cells matter: keep the
+            # candidates with the smallest empty-cell pattern before labelling
+            filled = (values > 0) @ _PLACE_BITS
+            best = filled == filled.min()
+            values, row, parent = values[best], row[best], parent[best]
+
+        child_mapping = mapping[parent].ravel()
+        child_next = next_label[parent]
+        base = np.arange(0, 10 * len(parent), 10)
+        labelled = np.empty_like(values)
+        for col in range(BOARD_SIZE):
+            slot = base + values[:, col]
+            label = child_mapping[slot]
+            fresh = np.flatnonzero((label == 0) & (values[:, col] > 0))
+            label[fresh] = child_next[fresh]
+            child_mapping[slot[fresh]] = label[fresh]
+            child_next[fresh] += 1
+            labelled[:, col] = label
+
+        keys = labelled @ _PLACE_VALUES
+        best = keys == keys.min()
+        placed_row = labelled[best][0]
+        rows.append(placed_row)
+        placed += int(np.count_nonzero(placed_row))
+
+        parent, row = parent[best], row[best]
+        transposed = transposed[parent]
+        orders = orders[parent]
+        used_rows = used_rows[parent] | (1 << row)
+        current_band = _ROW_BAND[row]
+        mapping = child_mapping.reshape(-1, 10)[best]
+        next_label = child_next[best]
+
+        if not placed_row.any() and len(parent) > count:
+            # Candidates that placed empty rows in different orders reach
+            # the same state and have the same future: keep one of each
+            state = np.column_stack([transposed, orders, used_rows, current_band, mapping])
+            _, first = np.unique(state, axis=0, return_index=True)
+            transposed, orders, used_rows = transposed[first], orders[first], used_rows[first]
+            current_band, mapping, next_label = current_band[first], mapping[first], next_label[first]
+
+    rows += [np.zeros(BOARD_SIZE, dtype=np.int64)] * (BOARD_SIZE - len(rows))
+    return np.array(rows, dtype=int)
+
+
+def canonical_key(grid):
+    """Packed canonical_form(), shared by every grid equivalent to this one.
+
+    A call costs a few milliseconds on a puzzle and tens to hundreds on a
+    full or nearly empty grid, so it suits deduplicating puzzles (see
+    CanonicalIndex) rather than keying a search's transposition table.
+    """
+    return pack_state(canonical_form(grid))
+
+
+def symmetry_signature(grid):
+    """Cheap invariant of a grid's symmetry class.
+
+    Equivalent grids always share it; grids with different clue layouts
+    or digit counts almost never do. It is made of the sorted digit
+    frequencies and, for rows and for columns, the multiset over bands
+    (stacks) of their sorted line clue counts and sorted box clue counts,
+    the two sides sorted so that transposition does not change it.
+    """
+    grid = np.asarray(grid).reshape(BOARD_SIZE, BOARD_SIZE)
+    filled = grid > 0
+    digits = tuple(sorted(np.bincount(grid.ravel(), minlength=10)[1:].tolist()))
+    return (digits,) + tuple(sorted((_band_pattern(filled), _band_pattern(filled.T))))
+
+
+def _band_pattern(filled):
+    lines = filled.sum(axis=1).reshape(3, 3).tolist()
+    boxes = filled.reshape(3, 3, 3, 3).sum(axis=(1, 3)).tolist()
+    return tuple(sorted(tuple(sorted(line)) + tuple(sorted(box)) for line, box in zip(lines, boxes)))
+
+
+class CanonicalIndex:
+    """Set of grids up to the Sudoku symmetries.
+
+    Grids are bucketed by symmetry_signature() and the full canonical form
+    is only computed once two grids share a bucket, so deduplicating
+    puzzles with distinct clue layouts costs one signature each instead
+    of one canonical_form() each.
+    """
+
+    def __init__(self):
+        # signature -> [packed grid, canonical key or None until needed]
+        self.buckets = {}
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def _lookup(self, grid):
+        """(signature, canonical key or None, True if an equivalent grid is stored)"""
+        signature = symmetry_signature(grid)
+        bucket = self.buckets.get(signature)
+        if bucket is None:
+            return signature, None, False
+        key = canonical_key(grid)
+        for entry in bucket:
+            if entry[1] is None:
+                entry[1] = canonical_key(unpack_state(entry[0]))
+            if entry[1] == key:
+                return signature, key, True
+        return signature, key, False
+
+    def __contains__(self, grid):
+        return self._lookup(grid)[2]
+
+    def add(self, grid):
+        """Store a grid; False if an equivalent one is already stored"""
+        signature, key, found = self._lookup(grid)
+        if found:
+            return False
+        self.buckets.setdefault(signature, []).append([pack_state(grid), key])
+        self.size += 1
+        return True
+
+
+def unique_grids(grids):
+    """Yield the grids that are not equivalent to an earlier one"""
+    index = CanonicalIndex()
+    for grid in grids:
+        if index.add(grid):
+            yield grid
@@ -61,6 +61,20 @@ DIFFICULTY_LEVELS = {
     "Hard": 20       # 20 cells filled
 }
 
+# Technique-based ratings, from the hardest human technique a puzzle needs
+RATINGS = ["Beginner", "Intermediate", "Advanced", "Expert"]
+
+# Time budget (seconds) for pushing a unique puzzle down to its clue target;
+# most 20-clue puzzles take well under a second, this bounds the slow tail
+GENERATION_TIME_LIMIT = 2
+
+# Pre-generated puzzles (PUZZLE_BANK_PATH + ".bin"/".json"), built with
+# `python -m game.puzzle_bank`; new games are generated live when missing
+PUZZLE_BANK_PATH = "puzzle_bank"
+
+# Time budget (seconds) for finding a puzzle with a requested rating
+RATING_TIME_LIMIT = 3
+
 # Algorithm categories
 ALGORITHMS = {
     "Uninformed Search": [
@@ -89,13 +103,19 @@ ALGORITHMS = {
     "Constraint Satisfaction Problem": [
         "AC-3",
         "Forward Checking", 
-        "Backtracking"
+        "Backtracking",
+        "Dancing Links (DLX)",
+        "Maintaining Arc Consistency (MAC)",
+        "SAT"
     ],
     "Reinforcement Learning": [
         "Q-Learning"
     ]
 }
 
+# Algorithm selected when the application starts
+DEFAULT_ALGORITHM = "Dancing Links (DLX)"
+
 # Font settings
 TITLE_FONT_SIZE = 36
 CATEGORY_FONT_SIZE = 28
@@ -115,4 +135,10 @@ CATEGORY_COLORS = {
 }
 
 # Timeout for solving algorithms (seconds)
-SOLVE_TIMEOUT = 5
\ No newline at end of file
+SOLVE_TIMEOUT = 5
+# Memory (bytes) Breadth-First Search may use for its frontier, visited set
+# and recorded states before it stops and reports the search as truncated
+BFS_MEMORY_LIMIT = 256 * 1024 * 1024
+# Bytes of packed cutoff nodes Iterative Deepening Search keeps so that the
+# next depth limit resumes from them instead of the root (0 disables it)
+IDS_FRONTIER_LIMIT = 64 * 1024 * 1024
@@ -0,0 +1,23 @@
+from utils.constants import BOARD_SIZE
+
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+
+# Bits 1..9 set: every digit is still a candidate
+ALL_DIGITS = 0b1111111110
+
+# The 27 units (rows, columns, boxes) as lists of flat cell indices
+ROW_UNITS = [[r * 9 + c for c in range(9)] for r in range(9)]
+COL_UNITS = [[r * 9 + c for r in range(9)] for c in range(9)]
+BOX_UNITS = [[(br + r) * 9 + bc + c for r in range(3) for c in range(3)]
+             for br in range(0, 9, 3) for bc in range(0, 9, 3)]
+UNITS = ROW_UNITS + COL_UNITS + BOX_UNITS
+
+ROW_OF = [i // 9 for i in range(CELL_COUNT)]
+COL_OF = [i % 9 for i in range(CELL_COUNT)]
+BOX_OF = [(i // 27) * 3 + (i % 9) // 3 for i in range(CELL_COUNT)]
+
+# The 20 peers of every cell
+PEERS = [
+    sorted({p for unit in UNITS if i in unit for p in unit} - {i})
+    for i in range(CELL_COUNT)
+]
@@ -0,0 +1,163 @@
+import random
+from collections import OrderedDict
+import numpy as np
+from utils.constants import BOARD_SIZE
+
+CELL_COUNT = BOARD_SIZE * BOARD_SIZE
+
+# Two cells per byte (4 bits each): 81 cells fit in 41 bytes
+PACKED_STATE_SIZE = (CELL_COUNT + 1) // 2
+
+# One random 64-bit key per (cell, digit); digit 0 (empty) has key 0 so the
+# empty board hashes to 0 and placing a digit is a single XOR.
+# A fixed seed keeps hashes stable between runs.
+_rng = random.Random(0x5D0C0)
+ZOBRIST_KEYS = [[0] + [_rng.getrandbits(64) for _ in range(9)] for _ in range(CELL_COUNT)]
+_ZOBRIST_ARRAY = np.array(ZOBRIST_KEYS, dtype=np.uint64)
+_CELL_INDEX = np.arange(CELL_COUNT)
+
+
+def zobrist_hash(state):
+    """64-bit Zobrist hash of a whole board state"""
+    keys = _ZOBRIST_ARRAY[_CELL_INDEX, np.asarray(state).ravel()]
+    return int(np.bitwise_xor.reduce(keys))
+
+
+def child_key(parent_key, row, col, num):
+    """Hash of the state obtained by writing num into an empty cell of the parent"""
+    return parent_key ^ ZOBRIST_KEYS[row * BOARD_SIZE + col][num]
+
+
+def pack_state(state):
+    """Exact 41-byte encoding of a board state"""
+    flat = np.zeros(PACKED_STATE_SIZE * 2, dtype=np.uint8)
+    flat[:CELL_COUNT] = np.asarray(state).ravel()
+    return (flat[0::2] | (flat[1::2] << 4)).tobytes()
+
+
+def unpack_state(data):
+    """Inverse of pack_state"""
+    packed = np.frombuffer(data, dtype=np.uint8)
+    flat = np.empty(PACKED_STATE_SIZE * 2, dtype=int)
+    flat[0::2] = packed & 0x0F
+    flat[1::2] = packed >> 4
+    return flat[:CELL_COUNT].reshape(BOARD_SIZE, BOARD_SIZE)
+
+
+class StateKeySet:
+    """Visited set keyed by Zobrist hashes.
+
+    By default only the 64-bit hashes are kept. With exact=True the packed
+    encoding of every state is stored next to its hash, so two different
+    states that happen to share a hash are still told apart.
+    """
+
+    def __init__(self, exact=False):
+        self.exact = exact
+        self.keys = {} if exact else set()
+        self.collisions = set()
+
+    def __len__(self):
+        return len(self.keys) + len(self.collisions)
+
+    def __contains__(self, key):
+        return key in self.keys
+
+    def contains(self, key, state=None):
+        if key not in self.keys:
+            return False
+        if not self.exact or state is None:
+            return True
+        packed = pack_state(state)
+        return self.keys[key] == packed or packed in self.collisions
+
+    def add(self, key, state=None):
+        """Insert a state; returns False if it was already present"""
+        if not self.exact:
+            if key in self.keys:
+                return False
+            self.keys.add(key)
+            return True
+        packed = pack_state(state) if state is not None else None
+        stored = self.keys.get(key)
+        if stored is None and key not in self.keys:
+            self.keys[key] = packed
+            return True
+        if packed is None or stored == packed or packed in self.collisions:
+            return False
+        self.collisions.add(packed)
+        return True
+
+
+class BoundedTable:
+    """Map from state keys to values holding at most `limit` entries.
+
+    Reads and writes mark an entry as recently used; once full, the least
+    recently used entry is evicted. With limit=0 nothing is stored.
+    """
+
+    def __init__(self, limit):
+        self.limit = limit
+        self.entries = OrderedDict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key, default=None):
+        value = self.entries.get(key, default)
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        if not self.limit:
+            return
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.limit:
+            self.entries.popitem(last=False)
+
+
+def packed_child(packed, row, col, num):
+    """Packed encoding of the state obtained by writing num into an empty cell"""
+    cell = row * BOARD_SIZE + col
+    child = bytearray(packed)
+    child[cell // 2] |= num << (4 * (cell % 2))
+    return bytes(child)
+
+
+class PackedFrontier:
+    """FIFO of packed states stored back to back in one bytearray.
+
+    Every entry takes exactly PACKED_STATE_SIZE bytes; the consumed prefix
+    is dropped once it makes up half of the buffer.
+    """
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self.head = 0
+
+    def __len__(self):
+        return (len(self.buffer) - self.head) // PACKED_STATE_SIZE
+
+    def nbytes(self):
+        return len(self.buffer)
+
+    def append(self, packed):
+        self.buffer += packed
+
+    def __iter__(self):
+        """The queued states, oldest first, without consuming them"""
+        for start in range(self.head, len(self.buffer), PACKED_STATE_SIZE):
+            yield bytes(self.buffer[start:start + PACKED_STATE_SIZE])
+
+    def popleft(self):
+        if self.head >= len(self.buffer):
+            raise IndexError("pop from an empty frontier")
+        start = self.head
+        self.head += PACKED_STATE_SIZE
+        packed = bytes(self.buffer[start:self.head])
+        if self.head * 2 >= len(self.buffer):
+            del self.buffer[:self.head]
+            self.head = 0
+        return packed